@@ -2,6 +2,7 @@ import base64
 import copy
 import json
 import logging
+import types
 from collections import OrderedDict, Counter, deque, defaultdict
 from enum import Enum, unique
 
@@ -40,10 +41,13 @@ class World(object):
         self.shops = {}
         self.itempool = []
         self.seed = None
+        self.door_workers = 1
         self.precollected_items = []
+        self.region_index = {player: [] for player in range(1, players + 1)}
         self.state = CollectionState(self)
         self._cached_entrances = None
         self._cached_locations = None
+        self._cached_player_locations = {}
         self._entrance_cache = {}
         self._location_cache = {}
         self.required_locations = []
@@ -155,6 +159,9 @@ class World(object):
         for region in regions if regions else self.regions:
             region.world = self
             self._region_cache[region.player][region.name] = region
+            if region.index is None:
+                region.index = len(self.region_index[region.player])
+                self.region_index[region.player].append(region)
             for exit in region.exits:
                 self._entrance_cache[exit.name, exit.player] = exit
             for r_location in region.locations:
@@ -396,28 +403,38 @@ class World(object):
                 self._cached_locations.extend(region.locations)
         return self._cached_locations
 
+    def get_player_locations(self, player):
+        if player not in self._cached_player_locations:
+            self._cached_player_locations[player] = [x for x in self.get_locations() if x.player == player]
+        return self._cached_player_locations[player]
+
     def clear_location_cache(self):
         self._cached_locations = None
+        self._cached_player_locations.clear()
 
     def clear_exp_cache(self):
         for p in range(1, self.players + 1):
             self.exp_cache[p].clear()
 
     def get_unfilled_locations(self, player=None):
-        return [location for location in self.get_locations() if (player is None or location.player == player) and location.item is None]
+        locations = self.get_locations() if player is None else self.get_player_locations(player)
+        return [location for location in locations if location.item is None]
 
     def get_filled_locations(self, player=None):
-        return [location for location in self.get_locations() if (player is None or location.player == player) and location.item is not None]
+        locations = self.get_locations() if player is None else self.get_player_locations(player)
+        return [location for location in locations if location.item is not None]
 
     def get_reachable_locations(self, state=None, player=None):
         if state is None:
             state = self.state
-        return [location for location in self.get_locations() if (player is None or location.player == player) and location.can_reach(state)]
+        locations = self.get_locations() if player is None else self.get_player_locations(player)
+        return [location for location in locations if location.can_reach(state)]
 
     def get_placeable_locations(self, state=None, player=None):
         if state is None:
             state = self.state
-        return [location for location in self.get_locations() if (player is None or location.player == player) and location.item is None and location.can_reach(state)]
+        locations = self.get_locations() if player is None else self.get_player_locations(player)
+        return [location for location in locations if location.item is None and location.can_reach(state)]
 
     def unlocks_new_location(self, item):
         temp_state = self.state.copy()
@@ -478,7 +495,8 @@ class CollectionState(object):
         self.world = parent
         if not skip_init:
             self.prog_items = Counter()
-            self.reachable_regions = {player: dict() for player in range(1, parent.players + 1)}
+            self.reachable_regions = {player: RegionStates(parent.region_index[player])
+                                      for player in range(1, parent.players + 1)}
             self.blocked_connections = {player: dict() for player in range(1, parent.players + 1)}
             self.events = []
             self.path = {}
@@ -491,11 +509,16 @@ class CollectionState(object):
             self.reached_doors = {player: set() for player in range(1, parent.players + 1)}
             self.opened_doors = {player: set() for player in range(1, parent.players + 1)}
             self.dungeons_to_check = {player: defaultdict(dict) for player in range(1, parent.players + 1)}
+            # blocked connections whose rule only looked at items, with the item counts it saw
+            self.blocked_items = {player: dict() for player in range(1, parent.players + 1)}
+            # how many states hold each player's structures, see unshare
+            self.share_counts = {player: [1] for player in range(1, parent.players + 1)}
         self.dungeon_limits = None
         # self.trace = None
 
     def update_reachable_regions(self, player):
         self.stale[player] = False
+        self.unshare(player)
         rrp = self.reachable_regions[player]
         bc = self.blocked_connections[player]
 
@@ -524,7 +547,7 @@ class CollectionState(object):
             if not self.should_visit(new_region, rrp, crystal_state, player):
                 if not new_region or not self.dungeon_limits or self.possibly_connected_to_dungeon(new_region, player):
                     bc.pop(connection, None)
-            elif connection.can_reach(self):
+            elif self.can_traverse(connection, player):
                 bc.pop(connection, None)
                 if new_region.type == RegionType.Dungeon:
                     new_crystal_state = crystal_state
@@ -582,6 +605,31 @@ class CollectionState(object):
                         if key_logic.sm_doors[door]:
                             opened_doors.add(key_logic.sm_doors[door].name)
 
+    def can_traverse(self, connection, player):
+        # a connection that failed on items alone stays blocked until one of those items changes
+        blocked = self.blocked_items[player]
+        seen = blocked.get(connection)
+        if seen is not None:
+            if all(self.prog_items[item] == count for item, count in seen):
+                return False
+            del blocked[connection]
+        rule, only_items, keys = rule_check(connection)
+        if not only_items or not connection.parent_region.can_reach(self):
+            return connection.can_reach(self)
+        if keys is not None:
+            reachable = connection.can_reach(self)
+            if not reachable:
+                blocked[connection] = tuple((key, self.prog_items[key]) for key in keys)
+            return reachable
+        probe = self.prog_items = ItemProbe(self.prog_items)
+        try:
+            reachable = connection.can_reach(self)
+        finally:
+            self.prog_items = probe.prog_items
+        if not reachable and probe.complete:
+            blocked[connection] = tuple(probe.seen.items())
+        return reachable
+
     def should_visit(self, new_region, rrp, crystal_state, player):
         if not new_region:
             return False
@@ -630,6 +678,7 @@ class CollectionState(object):
                 if door_candidates:
                     for chosen_door in door_candidates:
                         child_state = next_child.copy()
+                        child_state.unshare(player)
                         child_queue = deque()
                         child_state.door_counter[player][1][dungeon_name] += 1
                         if isinstance(chosen_door, tuple):
@@ -780,22 +829,39 @@ class CollectionState(object):
     def copy(self):
         ret = CollectionState(self.world, skip_init=True)
         ret.prog_items = self.prog_items.copy()
-        ret.reachable_regions = {player: copy.copy(self.reachable_regions[player]) for player in range(1, self.world.players + 1)}
-        ret.blocked_connections = {player: copy.copy(self.blocked_connections[player]) for player in range(1, self.world.players + 1)}
         ret.events = copy.copy(self.events)
         ret.path = copy.copy(self.path)
         ret.locations_checked = copy.copy(self.locations_checked)
-        ret.stale = {player: self.stale[player] for player in range(1, self.world.players + 1)}
-        ret.door_counter = {player: (copy.copy(self.door_counter[player][0]), copy.copy(self.door_counter[player][1]))
-                            for player in range(1, self.world.players + 1)}
-        ret.reached_doors = {player: copy.copy(self.reached_doors[player]) for player in range(1, self.world.players + 1)}
-        ret.opened_doors = {player: copy.copy(self.opened_doors[player]) for player in range(1, self.world.players + 1)}
-        ret.dungeons_to_check = {
-            player: defaultdict(dict, {name: copy.copy(checklist)
-                                       for name, checklist in self.dungeons_to_check[player].items()})
-            for player in range(1, self.world.players + 1)}
+        ret.stale = copy.copy(self.stale)
+        # per player structures are shared with the copy until one side changes them
+        ret.reachable_regions = copy.copy(self.reachable_regions)
+        ret.blocked_connections = copy.copy(self.blocked_connections)
+        ret.door_counter = copy.copy(self.door_counter)
+        ret.reached_doors = copy.copy(self.reached_doors)
+        ret.opened_doors = copy.copy(self.opened_doors)
+        ret.dungeons_to_check = copy.copy(self.dungeons_to_check)
+        ret.blocked_items = copy.copy(self.blocked_items)
+        for count in self.share_counts.values():
+            count[0] += 1
+        ret.share_counts = copy.copy(self.share_counts)
         return ret
 
+    def unshare(self, player):
+        # copy-on-write: anything that changes a player's structures calls this first
+        count = self.share_counts[player]
+        if count[0] == 1:
+            return
+        count[0] -= 1
+        self.share_counts[player] = [1]
+        self.reachable_regions[player] = self.reachable_regions[player].copy()
+        self.blocked_connections[player] = copy.copy(self.blocked_connections[player])
+        self.door_counter[player] = (copy.copy(self.door_counter[player][0]), copy.copy(self.door_counter[player][1]))
+        self.reached_doors[player] = copy.copy(self.reached_doors[player])
+        self.opened_doors[player] = copy.copy(self.opened_doors[player])
+        self.dungeons_to_check[player] = defaultdict(dict, {name: copy.copy(checklist)
+                                                            for name, checklist in self.dungeons_to_check[player].items()})
+        self.blocked_items[player] = copy.copy(self.blocked_items[player])
+
     def apply_dungeon_exploration(self, rrp, player, dungeon_name, checklist):
         bc = self.blocked_connections[player]
         ec = self.world.exp_cache[player]
@@ -986,6 +1052,8 @@ class CollectionState(object):
         return self.prog_items[item, player] >= count
 
     def can_buy_unlimited(self, item, player):
+        if isinstance(self.prog_items, ItemProbe):
+            self.prog_items.complete = False  # depends on region access, not just items
         for shop in self.world.shops[player]:
             if shop.region.player == player and shop.has_unlimited(item) and shop.region.can_reach(self):
                 return True
@@ -1291,8 +1359,10 @@ class CollectionState(object):
                 if self.prog_items[to_remove, item.player] < 1:
                     del (self.prog_items[to_remove, item.player])
                 # invalidate caches, nothing can be trusted anymore now
-                self.reachable_regions[item.player] = dict()
+                self.unshare(item.player)
+                self.reachable_regions[item.player] = RegionStates(self.world.region_index[item.player])
                 self.blocked_connections[item.player] = dict()
+                self.blocked_items[item.player] = dict()
                 self.stale[item.player] = True
 
     def __getattr__(self, item):
@@ -1305,6 +1375,289 @@ class CollectionState(object):
 
         raise RuntimeError('Cannot parse %s.' % item)
 
+class RegionStates(object):
+    """Crystal state of each reachable region of one player, kept as one byte per region index"""
+    __slots__ = ('regions', 'bits')
+
+    def __init__(self, regions, bits=None):
+        self.regions = regions
+        self.bits = bytearray(len(regions)) if bits is None else bits
+
+    def value(self, region):
+        # indices are only unique within one player of one world, so anything else must not alias a region here
+        idx = region.index
+        if idx < len(self.bits) and self.regions[idx] is region:
+            return self.bits[idx]
+        return 0
+
+    def __contains__(self, region):
+        return self.value(region) != 0
+
+    def __getitem__(self, region):
+        value = self.value(region)
+        if not value:
+            raise KeyError(region)
+        return crystal_states[value & 3]
+
+    def __setitem__(self, region, crystal_state):
+        if region.index >= len(self.regions) or self.regions[region.index] is not region:
+            raise ValueError(f'{region} (Player {region.player}) does not belong to this state')
+        if region.index >= len(self.bits):
+            self.bits.extend(bytes(len(self.regions) - len(self.bits)))
+        self.bits[region.index] = 4 | crystal_state
+
+    def get(self, region, default=None):
+        return self[region] if region in self else default
+
+    def __iter__(self):
+        return (self.regions[idx] for idx, value in enumerate(self.bits) if value)
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        return ((self.regions[idx], crystal_states[value & 3]) for idx, value in enumerate(self.bits) if value)
+
+    def __len__(self):
+        return len(self.bits) - self.bits.count(0)
+
+    def copy(self):
+        return RegionStates(self.regions, bytearray(self.bits))
+
+
+class ItemProbe(object):
+    """Stand-in for CollectionState.prog_items that remembers which entries were looked at. Anything past a plain
+    lookup goes to the real items and marks the probe incomplete, so no verdict is kept from it"""
+
+    def __init__(self, items):
+        self.prog_items = items
+        self.seen = {}
+        self.complete = True
+
+    def __contains__(self, item):
+        self.seen[item] = self.prog_items[item]
+        return item in self.prog_items
+
+    def __getitem__(self, item):
+        count = self.seen[item] = self.prog_items[item]
+        return count
+
+    def __iter__(self):
+        self.complete = False
+        return iter(self.prog_items)
+
+    def __len__(self):
+        self.complete = False
+        return len(self.prog_items)
+
+    def __setitem__(self, item, count):
+        self.complete = False
+        self.prog_items[item] = count
+
+    def __delitem__(self, item):
+        self.complete = False
+        del self.prog_items[item]
+
+    def __getattr__(self, name):
+        # copy, get, update and the rest of Counter go straight to the real items, but the verdict can't be kept
+        if name == 'prog_items':
+            raise AttributeError(name)
+        self.complete = False
+        return getattr(self.prog_items, name)
+
+
+# CollectionState helpers that only look at prog_items and fixed world settings
+item_only_helpers = frozenset([
+    'has', 'has_sm_key', 'item_count', 'has_crystals', 'can_lift_rocks', 'has_bottle', 'bottle_count', 'has_hearts',
+    'heart_count', 'can_lift_heavy_rocks', 'can_extend_magic', 'can_kill_most_things', 'can_use_bombs',
+    'can_hit_crystal', 'can_hit_crystal_through_barrier', 'can_shoot_arrows', 'has_sword', 'has_beam_sword',
+    'has_blunt_weapon', 'has_Mirror', 'has_Boots', 'has_Pearl', 'has_fire_source', 'can_melt_things',
+    'can_avoid_lasers', 'has_misery_mire_medallion', 'has_turtle_rock_medallion', 'can_boots_clip_lw',
+    'can_boots_clip_dw', 'can_get_glitched_speed_lw', 'can_get_glitched_speed_dw', 'can_superbunny_mirror_with_sword',
+    'all', 'any', 'int', 'len', 'min', 'max'])
+
+
+def rule_check(spot):
+    # (rule, whether it only reads items, the item keys it reads if known up front)
+    rule = spot.access_rule
+    if spot.rule_check is None or spot.rule_check[0] is not rule:
+        only_items = function_reads_only_items(rule)
+        keys = rule.dependencies() if only_items and isinstance(rule, rule_types) else None
+        spot.rule_check = (rule, only_items, keys)
+    return spot.rule_check
+
+
+def function_reads_only_items(func):
+    if isinstance(func, rule_types):
+        return func.reads_only_items()
+    if not isinstance(func, types.FunctionType) or not code_reads_only_items(func.__code__):
+        return False
+    if func.__defaults__ or func.__kwdefaults__:
+        return False  # defaults can hold other rules, and they are not looked into
+    for cell in func.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            return False
+        if isinstance(value, (types.FunctionType,) + rule_types):
+            if not function_reads_only_items(value):
+                return False
+        elif not isinstance(value, (str, int)):
+            return False
+    return True
+
+
+def code_reads_only_items(code):
+    if not item_only_helpers.issuperset(code.co_names):
+        return False
+    return all(code_reads_only_items(const) for const in code.co_consts if isinstance(const, types.CodeType))
+
+
+class HasItem(object):
+    """Access rule for state.has(item, player, count)"""
+    __slots__ = ('item', 'player', 'count')
+
+    def __init__(self, item, player, count=1):
+        self.item = item
+        self.player = player
+        self.count = count
+
+    def __call__(self, state):
+        return state.has(self.item, self.player, self.count)
+
+    def reads_only_items(self):
+        return True
+
+    def dependencies(self):
+        return frozenset([(self.item, self.player)])
+
+
+class HasSmallKey(HasItem):
+    """Access rule for state.has_sm_key(key, player, count)"""
+    __slots__ = ()
+
+    def __call__(self, state):
+        return state.has_sm_key(self.item, self.player, self.count)
+
+    def dependencies(self):
+        return None  # retro keys come from shops
+
+
+# the items each CollectionState helper looks at, for helpers that read nothing but items and fixed settings
+helper_items = {
+    'has_Mirror': ('Magic Mirror',),
+    'has_Pearl': ('Moon Pearl',),
+    'has_Boots': ('Pegasus Boots',),
+    'can_lift_rocks': ('Power Glove', 'Titans Mitts'),
+    'can_lift_heavy_rocks': ('Titans Mitts',),
+    'has_fire_source': ('Fire Rod', 'Lamp'),
+    'has_sword': ('Fighter Sword', 'Master Sword', 'Tempered Sword', 'Golden Sword'),
+    'has_beam_sword': ('Master Sword', 'Tempered Sword', 'Golden Sword'),
+    'has_blunt_weapon': ('Fighter Sword', 'Master Sword', 'Tempered Sword', 'Golden Sword', 'Hammer'),
+    'can_melt_things': ('Fire Rod', 'Bombos', 'Fighter Sword', 'Master Sword', 'Tempered Sword', 'Golden Sword'),
+    'can_avoid_lasers': ('Mirror Shield', 'Cane of Byrna', 'Cape'),
+    'can_use_bombs': ('Bomb Upgrade (+10)',),
+}
+
+
+class HasHelper(object):
+    """Access rule for a helper listed in helper_items, e.g. state.has_Boots(player)"""
+    __slots__ = ('helper', 'player', 'method')
+
+    def __init__(self, helper, player):
+        if helper not in helper_items:
+            raise ValueError(f'{helper} is not a known item helper')
+        self.helper = helper
+        self.player = player
+        self.method = getattr(CollectionState, helper)
+
+    def __call__(self, state):
+        return self.method(state, self.player)
+
+    def reads_only_items(self):
+        return True
+
+    def dependencies(self):
+        return frozenset((item, self.player) for item in helper_items[self.helper])
+
+
+class AllOf(object):
+    """Access rule that passes when every one of its rules does, tested in order"""
+    __slots__ = ('rules',)
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+
+    def __call__(self, state):
+        for rule in self.rules:
+            if not rule(state):
+                return False
+        return True
+
+    def reads_only_items(self):
+        return all(function_reads_only_items(rule) for rule in self.rules)
+
+    def dependencies(self):
+        return rules_dependencies(self.rules)
+
+
+class AnyOf(AllOf):
+    """Access rule that passes when any one of its rules does, tested in order"""
+    __slots__ = ()
+
+    def __call__(self, state):
+        for rule in self.rules:
+            if rule(state):
+                return True
+        return False
+
+
+rule_types = (HasItem, HasHelper, AllOf)
+
+
+def rules_dependencies(rules):
+    # the (item, player) keys a set of rules looks at, or None if some rule can't say
+    keys = set()
+    for rule in rules:
+        dependencies = getattr(rule, 'dependencies', None)
+        found = dependencies() if dependencies is not None else None
+        if found is None:
+            return None
+        keys.update(found)
+    return frozenset(keys)
+
+
+def all_of(*rules):
+    flat = []
+    for rule in rules:
+        flat.extend(rule.rules if type(rule) is AllOf else (rule,))
+    return AllOf(flat)
+
+
+def any_of(*rules):
+    flat = []
+    for rule in rules:
+        flat.extend(rule.rules if type(rule) is AnyOf else (rule,))
+    return AnyOf(flat)
+
+
+class ItemRule(object):
+    """Location item rule: forbidden (name, player) pairs are checked first, then the other rules in order"""
+    __slots__ = ('forbidden', 'rules')
+
+    def __init__(self, forbidden, rules):
+        self.forbidden = frozenset(forbidden)
+        self.rules = tuple(rules)
+
+    def __call__(self, item):
+        if (item.name, item.player) in self.forbidden:
+            return False
+        for rule in self.rules:
+            if not rule(item):
+                return False
+        return True
+
+
 @unique
 class RegionType(Enum):
     Menu = 0
@@ -1320,6 +1673,8 @@ class RegionType(Enum):
 
 
 class Region(object):
+    __slots__ = ('name', 'type', 'entrances', 'exits', 'locations', 'dungeon', 'shop', 'world', 'is_light_world',
+                 'is_dark_world', 'spot_type', 'hint_text', 'recursion_count', 'player', 'crystal_switch', 'index')
 
     def __init__(self, name, type, hint, player):
         self.name = name
@@ -1337,6 +1692,7 @@ class Region(object):
         self.recursion_count = 0
         self.player = player
         self.crystal_switch = False
+        self.index = None
 
     def can_reach(self, state):
         if state.stale[self.player]:
@@ -1370,6 +1726,8 @@ class Region(object):
 
 
 class Entrance(object):
+    __slots__ = ('name', 'parent_region', 'connected_region', 'target', 'addresses', 'spot_type', 'recursion_count',
+                 'vanilla', 'access_rule', 'player', 'door', 'hide_path', 'rule_check')
 
     def __init__(self, player, name='', parent=None):
         self.name = name
@@ -1384,6 +1742,7 @@ class Entrance(object):
         self.player = player
         self.door = None
         self.hide_path = False
+        self.rule_check = None
 
     def can_reach(self, state):
         if self.parent_region.can_reach(state) and self.access_rule(state):
@@ -1611,7 +1970,17 @@ class CrystalBarrier(FastEnum):
     Either = 3  # you choose to leave this room in Either state
 
 
+crystal_states = (CrystalBarrier.Null, CrystalBarrier.Blue, CrystalBarrier.Orange, CrystalBarrier.Either)
+
+
 class Door(object):
+    __slots__ = ('player', 'name', 'type', 'direction', 'roomIndex', 'doorIndex', 'layer', 'pseudo_bg', 'toggle',
+                 'trapFlag', 'quadrant', 'shiftX', 'shiftY', 'zeroHzCam', 'zeroVtCam', 'doorListPos', 'edge_id',
+                 'edge_width', 'portalAble', 'roomLayout', 'entranceFlag', 'deadEnd', 'passage', 'dungeonLink',
+                 'bk_shuffle_req', 'standard_restricted', 'lw_restricted', 'rupee_bow_restricted', 'dest', 'blocked',
+                 'blocked_orig', 'stonewall', 'smallKey', 'bigKey', 'ugly', 'crystal', 'req_event', 'controller',
+                 'dependents', 'dead', 'entrance')
+
     def __init__(self, player, name, type, entrance=None):
         self.player = player
         self.name = name
@@ -1830,6 +2199,9 @@ class Door(object):
 
 
 class Sector(object):
+    __slots__ = ('regions', 'outstanding_doors', 'name', 'r_name_set', 'chest_locations', 'key_only_locations',
+                 'c_switch', 'orange_barrier', 'blue_barrier', 'bk_required', 'bk_provided', 'conn_balance',
+                 'branch_factor', 'dead_end_cnt', 'entrance_sector', 'destination_entrance', 'equations', 'item_logic')
 
     def __init__(self):
         self.regions = []
@@ -2071,6 +2443,10 @@ class Boss(object):
         return self.defeat_rule(state, self.player)
 
 class Location(object):
+    __slots__ = ('name', 'parent_region', 'forced_item', 'item', 'event', 'crystal', 'address', 'player_address',
+                 'spot_type', 'hint_text', 'recursion_count', 'staleness_count', 'locked', 'always_allow',
+                 'access_rule', 'item_rule', 'player', 'skip')
+
     def __init__(self, player, name='', address=None, crystal=False, hint_text=None, parent=None, forced_item=None, player_address=None):
         self.name = name
         self.parent_region = parent
@@ -2137,6 +2513,9 @@ class Location(object):
 
 
 class Item(object):
+    __slots__ = ('name', 'advancement', 'priority', 'type', 'pedestal_hint_text', 'pedestal_credit_text',
+                 'sickkid_credit_text', 'zora_credit_text', 'magicshop_credit_text', 'fluteboy_credit_text', 'hint_text',
+                 'code', 'price', 'location', 'world', 'player')
 
     def __init__(self, name='', advancement=False, priority=False, type=None, code=None, price=999, pedestal_hint=None,
                  pedestal_credit=None, sickkid_credit=None, zora_credit=None, witch_credit=None, fluteboy_credit=None,
@@ -2196,7 +2575,7 @@ class Item(object):
 
 # have 6 address that need to be filled
 class Crystal(Item):
-    pass
+    __slots__ = ()
 
 @unique
 class ShopType(Enum):
@@ -71,6 +71,9 @@ def parse_cli(argv, no_defaults=False):
 
     parser.add_argument('--seed', default=defval(int(settings["seed"]) if settings["seed"] != "" and settings["seed"] is not None else None), help="\n".join(fish.translate("cli", "help", "seed")), type=int)
     parser.add_argument('--count', default=defval(int(settings["count"]) if settings["count"] != "" and settings["count"] is not None else 1), help="\n".join(fish.translate("cli", "help", "count")), type=int)
+    parser.add_argument('--jobs', default=defval(int(settings["jobs"])), help="\n".join(fish.translate("cli", "help", "jobs")), type=lambda value: max(int(value), 1))
+    parser.add_argument('--rom_workers', default=defval(int(settings["rom_workers"])), help="\n".join(fish.translate("cli", "help", "rom_workers")), type=lambda value: max(int(value), 1))
+    parser.add_argument('--door_workers', default=defval(int(settings["door_workers"])), help="\n".join(fish.translate("cli", "help", "door_workers")), type=lambda value: max(int(value), 1))
     parser.add_argument('--customitemarray', default={}, help=argparse.SUPPRESS)
 
     # included for backwards compatibility
@@ -206,6 +209,9 @@ def parse_settings():
 
         "seed": "",
         "count": 1,
+        "jobs": 1,
+        "door_workers": 1,
+        "rom_workers": 1,
         "startinventory": "",
         "beemizer": 0,
         "remote_items": False,
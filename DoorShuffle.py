@@ -1,6 +1,8 @@
 import RaceRandom as random
 from collections import defaultdict, deque
+from itertools import islice
 import logging
+import multiprocessing
 import time
 from enum import unique, Flag
 from typing import DefaultDict, Dict, List
@@ -16,14 +18,17 @@ from DungeonGenerator import create_dungeon_builders, split_dungeon_builder, sim
 from DungeonGenerator import dungeon_portals, dungeon_drops, GenerationException
 from DungeonGenerator import valid_region_to_explore as valid_region_to_explore_lim
 from KeyDoorShuffle import analyze_dungeon, build_key_layout, validate_key_layout, determine_prize_lock
-from Utils import ncr, kth_combination
+from Utils import ncr, kth_combination, random_permutation
 
 
 def link_doors(world, player):
     orig_swamp_patch = world.swamp_patch_required[player]
+    attempt_seed = find_door_attempt(world, player)
     attempt, valid = 1, False
     while not valid:
         try:
+            if attempt_seed is not None:
+                random.seed(attempt_seed)
             link_doors_main(world, player)
             valid = True
         except GenerationException as e:
@@ -31,20 +36,65 @@ def link_doors(world, player):
             attempt += 1
             if attempt > 10:
                 raise Exception('Could not create world in 10 attempts. Generation algorithms need more work', e)
-            for door in world.doors:
-                if door.player == player:
-                    door.dest = None
-                    door.entranceFlag = False
-                    ent = door.entrance
-                    if (door.type != DoorType.Logical or door.controller) and ent.connected_region is not None:
-                        ent.connected_region.entrances = [x for x in ent.connected_region.entrances if x != ent]
-                        ent.connected_region = None
-            for portal in world.dungeon_portals[player]:
-                disconnect_portal(portal, world, player)
-            reset_portals(world, player)
-            reset_rooms(world, player)
-            world.get_door("Skull Pinball WS", player).no_exit()
-            world.swamp_patch_required[player] = orig_swamp_patch
+            attempt_seed = None
+            reset_door_attempt(world, player, orig_swamp_patch)
+
+
+_door_attempt_world = None
+
+
+def find_door_attempt(world, player):
+    # tries the layout attempts in forked workers and returns the seed of the first valid one, which is then replayed
+    # in this process. Attempts are judged in order so the result does not depend on which worker finishes first
+    if door_worker_count(world) <= 1 or world.doorShuffle[player] == 'vanilla':
+        return None
+    base_seed = random.getrandbits(32)
+    attempt_seeds = [f'{base_seed}-{player}-{attempt}' for attempt in range(1, 11)]
+    context = multiprocessing.get_context('fork')
+    with context.Pool(world.door_workers, init_door_attempt, (world, player), maxtasksperchild=1) as pool:
+        for attempt_seed, valid in zip(attempt_seeds, pool.imap(try_door_attempt, attempt_seeds)):
+            if valid:
+                return attempt_seed
+    raise Exception('Could not create world in 10 attempts. Generation algorithms need more work')
+
+
+def door_worker_count(world):
+    # workers inherit the world by forking, so other platforms stay serial
+    return world.door_workers if 'fork' in multiprocessing.get_all_start_methods() else 1
+
+
+def init_door_attempt(world, player):
+    global _door_attempt_world
+    _door_attempt_world = world, player
+    world.door_workers = 1  # pool workers cannot start pools of their own
+    logging.disable(logging.CRITICAL)
+
+
+def try_door_attempt(attempt_seed):
+    world, player = _door_attempt_world
+    random.seed(attempt_seed)
+    try:
+        link_doors_main(world, player)
+    except GenerationException:
+        return False
+    return True
+
+
+def reset_door_attempt(world, player, orig_swamp_patch):
+    for door in world.doors:
+        if door.player == player:
+            door.dest = None
+            door.entranceFlag = False
+            ent = door.entrance
+            if (door.type != DoorType.Logical or door.controller) and ent.connected_region is not None:
+                ent.connected_region.entrances = [x for x in ent.connected_region.entrances if x != ent]
+                ent.connected_region = None
+    for portal in world.dungeon_portals[player]:
+        disconnect_portal(portal, world, player)
+    reset_portals(world, player)
+    reset_rooms(world, player)
+    world.get_door("Skull Pinball WS", player).no_exit()
+    world.swamp_patch_required[player] = orig_swamp_patch
 
 
 def link_doors_main(world, player):
@@ -1457,9 +1507,8 @@ def find_valid_combination(builder, start_regions, world, player, drop_keys=True
     combinations = ncr(len(builder.candidates), builder.key_doors_num)
     itr = 0
     start = time.process_time()
-    sample_list = list(range(0, int(combinations)))
-    random.shuffle(sample_list)
-    proposal = kth_combination(sample_list[itr], builder.candidates, builder.key_doors_num)
+    sample_order = random_permutation(combinations, [random.getrandbits(32) for _ in range(4)])
+    proposal = kth_combination(next(sample_order), builder.candidates, builder.key_doors_num)
 
     # eliminate start region if portal marked as destination
     excluded = {}
@@ -1476,8 +1525,14 @@ def find_valid_combination(builder, start_regions, world, player, drop_keys=True
         stop_early = False
         if itr % 1000 == 0:
             mark = time.process_time()-start
-            if (mark > 10 and itr*100/combinations > 50) or (mark > 20 and itr*100/combinations > 25) or mark > 30:
-                stop_early = True
+            stop_early = stop_combination_search(mark, itr, combinations)
+        if door_worker_count(world) > 1 and not stop_early and combinations - itr > validation_chunk_size:
+            itr, found = validate_combinations_in_workers(key_layout, builder, sample_order, itr, combinations, world, player)
+            if found is not None:
+                proposal = kth_combination(found, builder.candidates, builder.key_doors_num)
+                key_layout.reset(proposal, builder, world, player)
+                continue
+            stop_early = True
         if itr >= combinations or stop_early:
             if not drop_keys:
                 logger.info('No valid layouts for %s with %s doors', builder.name, builder.key_doors_num)
@@ -1487,11 +1542,10 @@ def find_valid_combination(builder, start_regions, world, player, drop_keys=True
             if builder.key_doors_num < 0:
                 raise Exception('Bad dungeon %s - 0 key doors not valid' % builder.name)
             combinations = ncr(len(builder.candidates), builder.key_doors_num)
-            sample_list = list(range(0, int(combinations)))
-            random.shuffle(sample_list)
+            sample_order = random_permutation(combinations, [random.getrandbits(32) for _ in range(4)])
             itr = 0
             start = time.process_time()  # reset time since itr reset
-        proposal = kth_combination(sample_list[itr], builder.candidates, builder.key_doors_num)
+        proposal = kth_combination(next(sample_order), builder.candidates, builder.key_doors_num)
         key_layout.reset(proposal, builder, world, player)
         if (itr+1) % 1000 == 0:
             mark = time.process_time()-start
@@ -1506,6 +1560,57 @@ def find_valid_combination(builder, start_regions, world, player, drop_keys=True
     return True
 
 
+def stop_combination_search(mark, itr, combinations):
+    return (mark > 10 and itr*100/combinations > 50) or (mark > 20 and itr*100/combinations > 25) or mark > 30
+
+
+validation_chunk_size = 100
+_key_validation_inputs = None
+
+
+def validate_combinations_in_workers(key_layout, builder, sample_order, itr, combinations, world, player):
+    # validates the rest of sample_order in chunks on forked workers. Chunks are consumed in sample order and each
+    # reports its first valid combination, so the same combination wins as in the serial search
+    logger = logging.getLogger('')
+    start = time.perf_counter()
+    pending = deque()
+    context = multiprocessing.get_context('fork')
+    with context.Pool(world.door_workers, init_key_validation, (key_layout, builder, world, player)) as pool:
+        while True:
+            while len(pending) < world.door_workers * 2:
+                chunk = list(islice(sample_order, validation_chunk_size))
+                if not chunk:
+                    break
+                pending.append((chunk, pool.apply_async(validate_combination_chunk, (chunk,))))
+            if not pending:
+                return itr, None
+            chunk, result = pending.popleft()
+            found = result.get()
+            if found is not None:
+                return itr + chunk.index(found), found
+            itr += len(chunk)
+            if itr % 1000 < len(chunk):
+                mark = time.perf_counter()-start
+                logger.info('%s time elapsed. %s iterations/s', mark, itr/mark)
+                if stop_combination_search(mark, itr, combinations):
+                    return itr, None
+
+
+def init_key_validation(key_layout, builder, world, player):
+    global _key_validation_inputs
+    _key_validation_inputs = key_layout, builder, world, player
+
+
+def validate_combination_chunk(chunk):
+    key_layout, builder, world, player = _key_validation_inputs
+    for idx in chunk:
+        proposal = kth_combination(idx, builder.candidates, builder.key_doors_num)
+        key_layout.reset(proposal, builder, world, player)
+        if validate_key_layout(key_layout, world, player):
+            return idx
+    return None
+
+
 def log_key_logic(d_name, key_logic):
     logger = logging.getLogger('')
     if logger.isEnabledFor(logging.DEBUG):
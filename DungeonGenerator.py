@@ -119,6 +119,9 @@ def generate_dungeon_find_proposal(builder, entrance_region_names, split_dungeon
     choices_master = [[]]
     depth = 0
     dungeon_cache = {}
+    # layouts check_valid turned down, whatever order their links were made in. layout_hash is an order free hash of
+    # proposed_map kept up to date as links are made, so the layout itself is only built on a hash hit or a rejection
+    invalid_layouts, invalid_hashes, layout_hash = set(), set(), 0
     backtrack = False
     itr = 0
     attempt = 1
@@ -135,16 +138,23 @@ def generate_dungeon_find_proposal(builder, entrance_region_names, split_dungeon
             choices_master = [[]]
             depth = 0
             dungeon_cache = {}
+            invalid_layouts, invalid_hashes, layout_hash = set(), set(), 0
             backtrack = False
             itr = 0
             attempt += 1
             logger.debug(f'Starting new attempt {attempt}')
         if depth not in dungeon_cache.keys():
-            dungeon, hangers, hooks = gen_dungeon_info(name, builder.sectors, entrance_regions, all_regions, proposed_map,
-                                                       doors_to_connect, bk_needed, bk_special, world, player)
-            dungeon_cache[depth] = dungeon, hangers, hooks
-            valid = check_valid(name, dungeon, hangers, hooks, proposed_map, doors_to_connect, all_regions,
-                                bk_needed, bk_special, paths, entrance_regions, world, player)
+            if layout_hash in invalid_hashes and frozenset(proposed_map.items()) in invalid_layouts:
+                valid = False
+            else:
+                dungeon, hangers, hooks = gen_dungeon_info(name, builder.sectors, entrance_regions, all_regions, proposed_map,
+                                                           doors_to_connect, bk_needed, bk_special, world, player)
+                dungeon_cache[depth] = dungeon, hangers, hooks
+                valid = check_valid(name, dungeon, hangers, hooks, proposed_map, doors_to_connect, all_regions,
+                                    bk_needed, bk_special, paths, entrance_regions, world, player)
+                if not valid:
+                    invalid_layouts.add(frozenset(proposed_map.items()))
+                    invalid_hashes.add(layout_hash)
         else:
             dungeon, hangers, hooks = dungeon_cache[depth]
             valid = True
@@ -168,6 +178,7 @@ def generate_dungeon_find_proposal(builder, entrance_region_names, split_dungeon
                 logger.debug(' ' * depth + "%d: Linking %s to %s", depth, hanger.name, hook.name)
                 proposed_map[hanger] = hook
                 proposed_map[hook] = hanger
+                layout_hash ^= hash((hanger, hook)) ^ hash((hook, hanger))
                 last_choice = (hanger, hook)
                 choices_master[depth].append(last_choice)
                 depth += 1
@@ -185,6 +196,7 @@ def generate_dungeon_find_proposal(builder, entrance_region_names, split_dungeon
             logger.debug(' ' * depth + "%d: Rescinding %s, %s", depth, a.name, b.name)
             proposed_map.pop(a, None)
             proposed_map.pop(b, None)
+            layout_hash ^= hash((a, b)) ^ hash((b, a))
     return proposed_map
 
 
@@ -757,8 +769,8 @@ class ExplorationState(object):
         self.avail_doors = []
         self.event_doors = []
 
-        self.visited_orange = []
-        self.visited_blue = []
+        self.visited_orange = set()
+        self.visited_blue = set()
         self.events = set()
         self.crystal = init_crystal
 
@@ -773,6 +785,7 @@ class ExplorationState(object):
         self.big_key_special = False
 
         self.found_locations = []
+        self.found_location_set = set()
         self.ttl_locations = 0
         self.used_locations = 0
         self.key_locations = 0
@@ -792,8 +805,8 @@ class ExplorationState(object):
         ret.unattached_doors = list(self.unattached_doors)
         ret.avail_doors = list(self.avail_doors)
         ret.event_doors = list(self.event_doors)
-        ret.visited_orange = list(self.visited_orange)
-        ret.visited_blue = list(self.visited_blue)
+        ret.visited_orange = set(self.visited_orange)
+        ret.visited_blue = set(self.visited_blue)
         ret.events = set(self.events)
         ret.crystal = self.crystal
         ret.door_krs = self.door_krs.copy()
@@ -808,6 +821,7 @@ class ExplorationState(object):
         ret.used_locations = self.used_locations
         ret.used_smalls = self.used_smalls
         ret.found_locations = list(self.found_locations)
+        ret.found_location_set = set(self.found_location_set)
         ret.bk_found = set(self.bk_found)
 
         ret.non_door_entrances = list(self.non_door_entrances)
@@ -820,32 +834,41 @@ class ExplorationState(object):
         return ret
 
     def next_avail_door(self):
-        self.avail_doors.sort(key=lambda x: 0 if x.flag else 1 if x.door.bigKey else 2)
-        exp_door = self.avail_doors.pop()
+        # the door a stable sort on (flag, big key, other) followed by pop() would pick: the last one added
+        # from the highest group. Other code extends avail_doors directly, so the list stays in insertion order
+        idx = self.last_door_index(lambda x: not x.flag and not x.door.bigKey)
+        if idx is None:
+            idx = self.last_door_index(lambda x: not x.flag)
+        exp_door = self.avail_doors.pop(-1 if idx is None else idx)
         self.crystal = exp_door.crystal
         return exp_door
 
+    def last_door_index(self, door_filter):
+        for idx in range(len(self.avail_doors) - 1, -1, -1):
+            if door_filter(self.avail_doors[idx]):
+                return idx
+        return None
+
     def visit_region(self, region, key_region=None, key_checks=False, bk_Flag=False):
         if region.type != RegionType.Dungeon:
             self.crystal = CrystalBarrier.Orange
         if self.crystal == CrystalBarrier.Either:
-            if region not in self.visited_blue:
-                self.visited_blue.append(region)
-            if region not in self.visited_orange:
-                self.visited_orange.append(region)
+            self.visited_blue.add(region)
+            self.visited_orange.add(region)
         elif self.crystal == CrystalBarrier.Orange:
-            self.visited_orange.append(region)
+            self.visited_orange.add(region)
         elif self.crystal == CrystalBarrier.Blue:
-            self.visited_blue.append(region)
+            self.visited_blue.add(region)
         if region.type == RegionType.Dungeon:
             for location in region.locations:
-                if key_checks and location not in self.found_locations:
+                if key_checks and location not in self.found_location_set:
                     if location.forced_item and 'Small Key' in location.item.name:
                         self.key_locations += 1
                     if location.name not in dungeon_events and '- Prize' not in location.name and location.name not in ['Agahnim 1', 'Agahnim 2']:
                         self.ttl_locations += 1
-                if location not in self.found_locations:  # todo: special logic for TT Boss?
+                if location not in self.found_location_set:  # todo: special logic for TT Boss?
                     self.found_locations.append(location)
+                    self.found_location_set.add(location)
                     if not bk_Flag:
                         self.bk_found.add(location)
                 if location.name in dungeon_events and location.name not in self.events:
@@ -860,7 +883,7 @@ class ExplorationState(object):
     def flooded_key_check(self, location):
         if location.name not in flooded_keys.keys():
             return True
-        return flooded_keys[location.name] in [x.name for x in self.found_locations]
+        return self.location_found(flooded_keys[location.name])
 
     def location_found(self, location_name):
         for l in self.found_locations:
@@ -998,23 +1021,27 @@ class ExplorationState(object):
         return self.can_traverse(door) and not self.visited(region) and valid_region_to_explore(region, self.dungeon,
                                                                                                 world, player)
 
+    # doors compare by name, comparing the names directly saves a call to Door.__eq__ per entry
     def in_door_list(self, door, door_list):
+        name = door.name
         for d in door_list:
-            if d.door == door and d.crystal == self.crystal:
+            if d.door.name == name and d.crystal == self.crystal:
                 return True
         return False
 
     @staticmethod
     def in_door_list_ic(door, door_list):
+        name = door.name
         for d in door_list:
-            if d.door == door:
+            if d.door.name == name:
                 return True
         return False
 
     @staticmethod
     def find_door_in_list(door, door_list):
+        name = door.name
         for d in door_list:
-            if d.door == door:
+            if d.door.name == name:
                 return d
         return None
 
@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 import argparse
 import copy
+import json
 import os
 import logging
 import RaceRandom as random
 import textwrap
 import shlex
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from source.classes.BabelFish import BabelFish
 import source.classes.diags as diagnostics
@@ -61,6 +64,8 @@ def start():
     if args.gui:
         from Gui import guiMain
         guiMain(args)
+    elif args.count is not None and args.count > 1 and args.jobs > 1:
+        farm_seeds(args, lang, fish)
     elif args.count is not None and args.count > 1:
         random.seed(None)
         seed = args.seed or random.randint(0, 999999999)
@@ -86,5 +91,67 @@ def start():
         main(seed=args.seed, args=args, fish=fish)
 
 
+def farm_seeds(args, lang, fish):
+    # spreads --count seeds over --jobs processes. The seeds are derived from the first one up front, so a farm is
+    # reproducible for a given --seed, but it does not follow the serial chain where each seed comes from the last run.
+    # Each seed writes into its own subdirectory: enemizer keeps its working files under fixed names in the output path
+    logger = logging.getLogger('')
+    random.seed(None)
+    seed = args.seed or random.randint(0, 999999999)
+    random.seed(seed)
+    seeds = [seed] + [random.randint(0, 999999999) for _ in range(args.count - 1)]
+    outputpath = args.outputpath if args.outputpath else '.'
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [executor.submit(generate_seed, args, farm_seed, lang, os.path.join(outputpath, str(farm_seed)))
+                   for farm_seed in seeds]
+        results = {}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as err:
+                # a worker that dies breaks the whole pool, every seed still waiting on it ends up here
+                result = {'seed': seeds[futures.index(future)], 'success': False, 'error': type(err).__name__, 'reason': str(err)}
+            results[future] = result
+            if result['success']:
+                logger.info('%s %s', fish.translate("cli","cli","finished.run"), result['seed'])
+            else:
+                logger.warning('%s: %s', fish.translate("cli","cli","generation.failed"), result['reason'])
+    results = [results[future] for future in futures]
+    failures = [result for result in results if not result['success']]
+    summary = {
+        'count': args.count,
+        'jobs': args.jobs,
+        'succeeded': len(results) - len(failures),
+        'failed': len(failures),
+        'time': round(time.perf_counter() - start_time, 3),
+        'seeds': results,
+    }
+    os.makedirs(outputpath, exist_ok=True)
+    summary_path = os.path.join(outputpath, f'DR_farm_{seed}.json')
+    with open(summary_path, 'w') as outfile:
+        json.dump(summary, outfile, indent=2)
+    for fail in failures:
+        logger.info('%s\tseed failed with: %s: %s', fail['seed'], fail['error'], fail['reason'])
+    logger.info('Generated %s of %s seeds in %ss, summary written to %s',
+                summary['succeeded'], args.count, summary['time'], summary_path)
+
+
+def generate_seed(args, seed, lang, outputpath):
+    loglevel = {'error': logging.ERROR, 'info': logging.INFO, 'warning': logging.WARNING, 'debug': logging.DEBUG}[args.loglevel]
+    logging.basicConfig(format='%(message)s', level=loglevel)
+    args = copy.copy(args)
+    args.outputpath = outputpath
+    result = {'seed': seed, 'outputpath': outputpath}
+    start_time = time.perf_counter()
+    try:
+        main(seed=seed, args=args, fish=BabelFish(lang=lang))
+        result['success'] = True
+    except Exception as err:
+        result.update(success=False, error=type(err).__name__, reason=str(err))
+    result['time'] = round(time.perf_counter() - start_time, 3)
+    return result
+
+
 if __name__ == '__main__':
     start()
@@ -178,6 +178,9 @@ def fill_restrictive(world, base_state, locations, itempool, keys_in_itempool =
         return new_state
 
     unplaced_items = []
+    # a reused state still counts the items being placed. No rule reads maps or compasses, so batches of only those
+    # can't change what the pool reaches. Hearts, arrows and bomb upgrades aren't advancement but rules do read them
+    maximum_exploration_state, logic_changed = None, True
 
     no_access_checks = {}
     reachable_items = {}
@@ -190,8 +193,13 @@ def fill_restrictive(world, base_state, locations, itempool, keys_in_itempool =
     for player_items in [no_access_checks, reachable_items]:
         while any(player_items.values()) and locations:
             items_to_place = [[itempool.remove(items[-1]), items.pop()][-1] for items in player_items.values() if items]
+            logic_items = not all(item.map or item.compass for item in items_to_place)
 
-            maximum_exploration_state = sweep_from_pool()
+            if logic_changed or logic_items:
+                maximum_exploration_state = sweep_from_pool()
+            else:
+                maximum_exploration_state.sweep_for_events()
+            logic_changed = logic_items
             has_beaten_game = world.has_beaten_game(maximum_exploration_state)
 
             for item_to_place in items_to_place:
@@ -225,6 +233,7 @@ def fill_restrictive(world, base_state, locations, itempool, keys_in_itempool =
                         continue
                     spot_to_fill = last_ditch_placement(item_to_place, locations, world, maximum_exploration_state,
                                                         base_state, itempool, keys_in_itempool, single_player_placement)
+                    logic_changed = True
                     if spot_to_fill is None:
                         raise FillError('No more spots to place %s' % item_to_place)
 
@@ -318,8 +327,9 @@ def find_spot_for_item(item_to_place, locations, world, base_state, pool,
             new_state.collect(item, True)
         new_state.sweep_for_events()
         return new_state
+    # the pool and the placed items are the same for every candidate location
+    maximum_exploration_state = sweep_from_pool()
     for location in locations:
-        maximum_exploration_state = sweep_from_pool()
         perform_access_check = True
         old_item = None
         if world.accessibility[item_to_place.player] == 'none':
@@ -3,6 +3,7 @@ import copy
 from itertools import zip_longest
 import json
 import logging
+import multiprocessing
 import os
 import RaceRandom as random
 import string
@@ -19,6 +20,7 @@ from Regions import create_regions, create_shops, mark_light_world_regions, crea
 from InvertedRegions import create_inverted_regions, mark_dark_world_regions
 from EntranceShuffle import link_entrances, link_inverted_entrances
 from Rom import patch_rom, patch_race_rom, patch_enemizer, apply_rom_settings, LocalRom, JsonRom, get_hash_string
+from Rom import distinguish_progressive_bow
 from Doors import create_doors
 from DoorShuffle import link_doors, connect_portal
 from RoomData import create_rooms
@@ -104,6 +106,8 @@ def main(args, seed=None, fish=None):
     world.treasure_hunt_total = args.triforce_pool.copy()
     world.shufflelinks = args.shufflelinks.copy()
     world.pseudoboots = args.pseudoboots.copy()
+    # layout attempts are replayed from derived seeds, which secure random cannot do
+    world.door_workers = 1 if args.securerandom else args.door_workers
 
     world.rom_seeds = {player: random.randint(0, 999999999) for player in range(1, world.players + 1)}
 
@@ -261,53 +265,17 @@ def main(args, seed=None, fish=None):
     enemized = False
     if not args.suppress_rom:
         logger.info(world.fish.translate("cli","cli","patching.rom"))
+        rom_tasks = []
         for team in range(world.teams):
             for player in range(1, world.players + 1):
-                sprite_random_on_hit = type(args.sprite[player]) is str and args.sprite[player].lower() == 'randomonhit'
-                use_enemizer = (world.boss_shuffle[player] != 'none' or world.enemy_shuffle[player] != 'none'
-                                or world.enemy_health[player] != 'default' or world.enemy_damage[player] != 'default'
-                                or sprite_random_on_hit)
-
-                rom = JsonRom() if args.jsonout or use_enemizer else LocalRom(args.rom)
-
-                if use_enemizer and (args.enemizercli or not args.jsonout):
-                    local_rom = LocalRom(args.rom)  # update base2current.json (side effect)
-                    if args.rom and not(os.path.isfile(args.rom)):
-                        raise RuntimeError("Could not find valid base rom for enemizing at expected path %s." % args.rom)
-                    if os.path.exists(args.enemizercli):
-                        patch_enemizer(world, player, rom, local_rom, args.enemizercli, sprite_random_on_hit)
-                        enemized = True
-                        if not args.jsonout:
-                            rom = LocalRom.fromJsonRom(rom, args.rom, 0x400000)
-                    else:
-                        enemizerMsg  = world.fish.translate("cli","cli","enemizer.not.found") + ': ' + args.enemizercli + "\n"
-                        enemizerMsg += world.fish.translate("cli","cli","enemizer.nothing.applied")
-                        logging.warning(enemizerMsg)
-                        raise EnemizerError(enemizerMsg)
-
-                patch_rom(world, rom, player, team, enemized, bool(args.outputname))
-
-                if args.race:
-                    patch_race_rom(rom)
-
-                rom_names.append((player, team, list(rom.name)))
-                world.spoiler.hashes[(player, team)] = get_hash_string(rom.hash)
-
-                apply_rom_settings(rom, args.heartbeep[player], args.heartcolor[player], args.quickswap[player],
-                                   args.fastmenu[player], args.disablemusic[player], args.sprite[player],
-                                   args.ow_palettes[player], args.uw_palettes[player], args.reduce_flashing[player],
-                                   args.shuffle_sfx[player])
-
-                if args.jsonout:
-                    jsonout[f'patch_t{team}_p{player}'] = rom.patches
-                else:
-                    outfilepname = f'_T{team+1}' if world.teams > 1 else ''
-                    if world.players > 1:
-                        outfilepname += f'_P{player}'
-                    if world.players > 1 or world.teams > 1:
-                        outfilepname += f"_{world.player_names[player][team].replace(' ', '_')}" if world.player_names[player][team] != 'Player %d' % player else ''
-                    outfilesuffix = f'_{Settings.make_code(world, player)}' if not args.outputname else ''
-                    rom.write_to_file(output_path(f'{outfilebase}{outfilepname}{outfilesuffix}.sfc'))
+                # a rom is patched as enemized once any earlier rom went through enemizer
+                rom_tasks.append((team, player, enemized))
+                enemized |= runs_enemizer(world, args, player)
+        for (team, player, _), (rom_name, rom_hash, patches) in zip(rom_tasks, output_roms(world, args, rom_tasks, outfilebase)):
+            rom_names.append((player, team, rom_name))
+            world.spoiler.hashes[(player, team)] = get_hash_string(rom_hash)
+            if args.jsonout:
+                jsonout[f'patch_t{team}_p{player}'] = patches
 
         if world.players > 1:
             multidata = zlib.compress(json.dumps({"names": parsed_names,
@@ -355,6 +323,112 @@ def main(args, seed=None, fish=None):
     return world
 
 
+def random_sprite_on_hit(args, player):
+    return type(args.sprite[player]) is str and args.sprite[player].lower() == 'randomonhit'
+
+
+def uses_enemizer(world, args, player):
+    return (world.boss_shuffle[player] != 'none' or world.enemy_shuffle[player] != 'none'
+            or world.enemy_health[player] != 'default' or world.enemy_damage[player] != 'default'
+            or random_sprite_on_hit(args, player))
+
+
+def runs_enemizer(world, args, player):
+    return uses_enemizer(world, args, player) and bool(args.enemizercli or not args.jsonout)
+
+
+def output_roms(world, args, rom_tasks, outfilebase):
+    workers = args.rom_workers if 'fork' in multiprocessing.get_all_start_methods() else 1
+    if workers <= 1 or len(rom_tasks) <= 1:
+        return [output_rom(world, args, team, player, enemized, outfilebase) for team, player, enemized in rom_tasks]
+    # enemizer works through fixed file names in the output path, so those roms stay in this process. Every rom reseeds
+    # from world.rom_seeds, so the order they are patched in does not matter otherwise
+    if not args.jsonout:
+        LocalRom(args.rom)  # patch the base rom once, before forking, so every worker starts from the cached image
+    results = [None] * len(rom_tasks)
+    context = multiprocessing.get_context('fork')
+    with context.Pool(workers, init_rom_output, (world, args, rom_tasks, outfilebase)) as pool:
+        pending = {}
+        for idx, task in enumerate(rom_tasks):
+            if not runs_enemizer(world, args, task[1]):
+                pending[idx] = pool.apply_async(output_rom_task, (idx,))
+        for idx, (team, player, enemized) in enumerate(rom_tasks):
+            if idx not in pending:
+                mark_progressive_bows(world, rom_tasks[:idx])
+                results[idx] = output_rom(world, args, team, player, enemized, outfilebase)
+        for idx, result in pending.items():
+            results[idx] = result.get()
+    mark_progressive_bows(world, rom_tasks)
+    return results
+
+
+def mark_progressive_bows(world, rom_tasks):
+    # patch_rom marks one progressive bow of its player, which may sit in another player's world, so a rom has to see
+    # the marks of every rom patched before it, and the multidata the marks of all of them
+    for team, player, enemized in rom_tasks:
+        random.seed(world.rom_seeds[player])
+        distinguish_progressive_bow(world, player)
+
+
+_rom_output_inputs = None
+
+
+def init_rom_output(world, args, rom_tasks, outfilebase):
+    global _rom_output_inputs
+    _rom_output_inputs = world, args, rom_tasks, outfilebase
+
+
+def output_rom_task(idx):
+    world, args, rom_tasks, outfilebase = _rom_output_inputs
+    mark_progressive_bows(world, rom_tasks[:idx])
+    team, player, enemized = rom_tasks[idx]
+    return output_rom(world, args, team, player, enemized, outfilebase)
+
+
+def output_rom(world, args, team, player, enemized, outfilebase):
+    use_enemizer = uses_enemizer(world, args, player)
+
+    rom = JsonRom() if args.jsonout or use_enemizer else LocalRom(args.rom)
+
+    if runs_enemizer(world, args, player):
+        local_rom = LocalRom(args.rom)  # update base2current.json (side effect)
+        if args.rom and not(os.path.isfile(args.rom)):
+            raise RuntimeError("Could not find valid base rom for enemizing at expected path %s." % args.rom)
+        if os.path.exists(args.enemizercli):
+            patch_enemizer(world, player, rom, local_rom, args.enemizercli, random_sprite_on_hit(args, player))
+            enemized = True
+            if not args.jsonout:
+                rom = LocalRom.fromJsonRom(rom, args.rom, 0x400000)
+        else:
+            enemizerMsg  = world.fish.translate("cli","cli","enemizer.not.found") + ': ' + args.enemizercli + "\n"
+            enemizerMsg += world.fish.translate("cli","cli","enemizer.nothing.applied")
+            logging.warning(enemizerMsg)
+            raise EnemizerError(enemizerMsg)
+
+    patch_rom(world, rom, player, team, enemized, bool(args.outputname))
+
+    if args.race:
+        patch_race_rom(rom)
+
+    rom_name = list(rom.name)
+
+    apply_rom_settings(rom, args.heartbeep[player], args.heartcolor[player], args.quickswap[player],
+                       args.fastmenu[player], args.disablemusic[player], args.sprite[player],
+                       args.ow_palettes[player], args.uw_palettes[player], args.reduce_flashing[player],
+                       args.shuffle_sfx[player])
+
+    if args.jsonout:
+        return rom_name, rom.hash, rom.patches
+    outfilepname = f'_T{team+1}' if world.teams > 1 else ''
+    if world.players > 1:
+        outfilepname += f'_P{player}'
+    if world.players > 1 or world.teams > 1:
+        outfilepname += f"_{world.player_names[player][team].replace(' ', '_')}" if world.player_names[player][team] != 'Player %d' % player else ''
+    outfilesuffix = f'_{Settings.make_code(world, player)}' if not args.outputname else ''
+    rom.write_to_file(output_path(f'{outfilebase}{outfilepname}{outfilesuffix}.sfc'))
+    return rom_name, rom.hash, None
+
+
 def copy_world(world):
     # ToDo: Not good yet
     ret = World(world.players, world.shuffle, world.doorShuffle, world.logic, world.mode, world.swords,
@@ -405,8 +479,6 @@ def copy_world(world):
     ret.mixed_travel = world.mixed_travel.copy()
     ret.standardize_palettes = world.standardize_palettes.copy()
 
-    ret.exp_cache = world.exp_cache.copy()
-
     for player in range(1, world.players + 1):
         if world.mode[player] != 'inverted':
             create_regions(ret, player)
@@ -536,13 +608,18 @@ def create_playthrough(world):
     # get locations containing progress items
     prog_locations = [location for location in world.get_filled_locations() if location.item.advancement]
     optional_locations = ['Trench 1 Switch', 'Trench 2 Switch', 'Ice Block Drop']
-    state_cache = [None]
+    state_cache = []
     collection_spheres = []
     state = CollectionState(world)
     sphere_candidates = list(prog_locations)
     logging.getLogger('').debug(world.fish.translate("cli","cli","building.collection.spheres"))
     while sphere_candidates:
         state.sweep_for_events(key_only=True)
+        # every culling check in this sphere starts from here, so the keys and reachable regions are worked out once
+        for player in range(1, world.players + 1):
+            if state.stale[player]:
+                state.update_reachable_regions(player)
+        state_cache.append(state.copy())
 
         sphere = set()
         # build up spheres of collection radius. Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
@@ -556,8 +633,6 @@ def create_playthrough(world):
 
         collection_spheres.append(sphere)
 
-        state_cache.append(state.copy())
-
         logging.getLogger('').debug(world.fish.translate("cli", "cli", "building.calculating.spheres"), len(collection_spheres), len(sphere), len(prog_locations))
         if not sphere:
             logging.getLogger('').error(world.fish.translate("cli", "cli", "cannot.reach.items"), [world.fish.translate("cli","cli","cannot.reach.item") % (location.item.name, location.item.player, location.name, location.player) for location in sphere_candidates])
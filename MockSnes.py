@@ -0,0 +1,172 @@
+import argparse
+import asyncio
+import json
+import time
+
+import MultiClient
+
+SD2SNES_WRITE_PREFIX = b'\x00\xE2\x20\x48\xEB\x48'
+
+class MockSnes:
+    """Stands in for a QUsb2snes websocket with a device attached, backed by bytearrays instead of a console"""
+    def __init__(self, sd2snes=False, latency=0, chunk_size=1024, rom=None):
+        self.device = 'SD2SNES COM3' if sd2snes else 'EMU SNES9X'
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.rom = bytearray(rom if rom is not None else 0x200000)
+        self.wram = bytearray(MultiClient.WRAM_SIZE)
+        self.sram = bytearray(0x10000)
+        self.open = True
+        self.closed = False
+        self.requests = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.replies = asyncio.Queue()
+        self.pending_put = None
+
+    def memory(self, address, size):
+        for start, memory in [(MultiClient.WRAM_START, self.wram), (MultiClient.SRAM_START, self.sram), (MultiClient.ROM_START, self.rom)]:
+            if start <= address and address + size <= start + len(memory):
+                return memory, address - start
+        raise ValueError('Address out of range %s (%d)' % (hex(address), size))
+
+    def read(self, address, size):
+        memory, offset = self.memory(address, size)
+        return bytes(memory[offset:offset + size])
+
+    def write(self, address, data):
+        memory, offset = self.memory(address, len(data))
+        memory[offset:offset + len(data)] = data
+
+    async def send(self, message):
+        if self.closed:
+            raise MultiClient.websockets.ConnectionClosed(None, None)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if isinstance(message, bytes):
+            put, self.pending_put = self.pending_put, None
+            self.bytes_written += len(message)
+            if put['Space'] == 'CMD':
+                self.run_sd2snes_cmd(message)
+            else:
+                self.write(int(put['Operands'][0], 16), message)
+            return
+
+        request = json.loads(message)
+        opcode = request['Opcode']
+        self.requests[opcode] = self.requests.get(opcode, 0) + 1
+        if opcode == 'DeviceList':
+            self.reply(json.dumps({'Results': [self.device]}))
+        elif opcode == 'Info':
+            self.reply(json.dumps({'Results': ['1.9.0', self.device, 'No Info']}))
+        elif opcode == 'GetAddress':
+            address, size = [int(operand, 16) for operand in request['Operands']]
+            data = self.read(address, size)
+            self.bytes_read += size
+            for chunk in range(0, size, self.chunk_size):
+                self.reply(data[chunk:chunk + self.chunk_size])
+        elif opcode == 'PutAddress':
+            self.pending_put = request
+
+    def run_sd2snes_cmd(self, cmd):
+        # runs the subset of 65816 snes_write assembles: REP/SEP #$20, LDA # and STA.l, after a fixed prologue. The
+        # accumulator is 16 bits whatever the M flag says: with it set, LDA only loads the low byte and STA only stores it
+        assert cmd.startswith(SD2SNES_WRITE_PREFIX)
+        pos = len(SD2SNES_WRITE_PREFIX)
+        wide = False
+        acc = bytearray(2)
+        while pos < len(cmd):
+            width = 2 if wide else 1
+            if cmd[pos:pos + 2] in [b'\xC2\x20', b'\xE2\x20']:
+                wide = cmd[pos] == 0xC2
+                pos += 2
+            elif cmd[pos] == 0xA9:
+                acc[:width] = cmd[pos + 1:pos + 1 + width]
+                pos += width + 1
+            elif cmd[pos] == 0x8F:
+                ptr = cmd[pos + 1] | (cmd[pos + 2] << 8) | (cmd[pos + 3] << 16)
+                if 0x7E0000 <= ptr < 0x7E0000 + MultiClient.WRAM_SIZE:
+                    self.wram[ptr - 0x7E0000:ptr - 0x7E0000 + width] = acc[:width]
+                pos += 4
+            else:
+                break
+
+    def reply(self, message):
+        self.replies.put_nowait(message)
+
+    async def recv(self):
+        message = await self.replies.get()
+        if message is None:
+            raise MultiClient.websockets.ConnectionClosed(None, None)
+        return message
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.replies.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+    async def close(self):
+        if not self.closed:
+            self.open = False
+            self.closed = True
+            self.replies.put_nowait(None)
+
+def attach_mock_snes(ctx : MultiClient.Context, snes : MockSnes):
+    """Attach the client to a mock device the way snes_connect attaches to a real one, returns the receive task"""
+    ctx.snes_socket = snes
+    ctx.snes_state = MultiClient.SNES_ATTACHED
+    ctx.snes_attached_device = (0, snes.device)
+    ctx.is_sd2snes = 'SD2SNES'.lower() in snes.device.lower()
+    return asyncio.create_task(MultiClient.snes_recv_loop(ctx))
+
+def bytewise_write_code(write_list):
+    """The sd2snes code snes_write used to assemble, one LDA/STA.l pair per byte"""
+    code = b''
+    for address, data in write_list:
+        for ptr, byte in enumerate(data, address + 0x7E0000 - MultiClient.WRAM_START):
+            code += b'\xA9' + bytes([byte]) + b'\x8F' + bytes([ptr & 0xFF, (ptr >> 8) & 0xFF, (ptr >> 16) & 0xFF])
+    return code
+
+def benchmark_write_code():
+    writes = {
+        'received item': [(MultiClient.RECV_PROGRESS_ADDR, bytes([0x12, 0x00, 0x0B, 0x02]))],
+        'scout reply': [(MultiClient.SCOUTREPLY_LOCATION_ADDR, bytes([0x05, 0x0B, 0x02]))],
+        'rom name': [(MultiClient.WRAM_START + 0x1000, bytes(range(0x41, 0x41 + MultiClient.ROMNAME_SIZE)))],
+        'cleared block': [(MultiClient.WRAM_START + 0x1000, bytes(0x100))]
+    }
+    for name, write_list in writes.items():
+        old_size, new_size = len(bytewise_write_code(write_list)), len(MultiClient.sd2snes_write_code(write_list))
+        print(f"{name}: {old_size} bytes of code per write before, {new_size} now ({new_size / old_size:.0%})")
+
+async def benchmark(sd2snes, latency, ticks):
+    ctx = MultiClient.Context(None, None, None)
+    snes = MockSnes(sd2snes, latency)
+    recv_task = attach_mock_snes(ctx, snes)
+    snes.wram[0x10] = 0x07
+    start = time.perf_counter()
+    for tick in range(ticks):
+        await MultiClient.snes_read(ctx, MultiClient.WRAM_START + 0x10, 1)
+        await MultiClient.snes_read(ctx, MultiClient.RECV_PROGRESS_ADDR, 8)
+        MultiClient.snes_buffered_write(ctx, MultiClient.RECV_PROGRESS_ADDR, bytes([tick & 0xFF, tick >> 8 & 0xFF]))
+        MultiClient.snes_buffered_write(ctx, MultiClient.RECV_ITEM_ADDR, bytes([0x0B]))
+        await MultiClient.snes_flush_writes(ctx)
+        await MultiClient.track_locations(ctx, 0, 0)
+    elapsed = time.perf_counter() - start
+    await snes.close()
+    await recv_task
+    print(f"{snes.device}, {latency * 1000:.1f}ms latency: {ticks / elapsed:.0f} ticks/s, requests {snes.requests}, "
+          f"{snes.bytes_read / ticks:.0f} bytes read and {snes.bytes_written / ticks:.0f} written per tick")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure MultiClient polling throughput against a mock snes.')
+    parser.add_argument('--latency', default=0.002, type=float, help='Seconds each request to the mock device takes')
+    parser.add_argument('--ticks', default=200, type=int)
+    args = parser.parse_args()
+    for sd2snes in [False, True]:
+        asyncio.run(benchmark(sd2snes, args.latency, args.ticks))
+    benchmark_write_code()
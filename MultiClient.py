@@ -1,10 +1,12 @@
 import aioconsole
 import argparse
 import asyncio
+import collections
 import colorama
 import json
 import logging
 import shlex
+import time
 import urllib.parse
 import websockets
 
@@ -25,6 +27,9 @@ class Context:
 
         self.exit_event = asyncio.Event()
         self.watcher_event = asyncio.Event()
+        self.watcher_interval = WATCHER_IDLE_INTERVAL
+        self.watcher_last_state = None
+        self.watcher_tick_times = collections.deque(maxlen=100)
 
         self.input_queue = asyncio.Queue()
         self.input_requests = 0
@@ -58,6 +63,7 @@ class Context:
         self.shop_mode = False
         self.retro_mode = False
         self.ignore_count = 0
+        self.savedata_snapshot = 0
 
 def color_code(*args):
     codes = {'reset': 0, 'bold': 1, 'underline': 4, 'black': 30, 'red': 31, 'green': 32, 'yellow': 33, 'blue': 34,
@@ -69,6 +75,8 @@ def color(text, *args):
     return color_code(*args) + text + color_code('reset')
 
 RECONNECT_DELAY = 30
+WATCHER_ACTIVE_INTERVAL = 0.25
+WATCHER_IDLE_INTERVAL = 2
 
 ROM_START = 0x000000
 WRAM_START = 0xF50000
@@ -97,6 +105,7 @@ DYNAMIC_TOTAL_ADDR = SAVEDATA_START + 0x33E         # 2 bytes
 MODE_FLAGS = SAVEDATA_START + 0x33D         # 1 byte
 
 SHOP_SRAM_LEN = 0x29  # 41 tracked items
+SNES_READ_MERGE_GAP = 0x200  # reading unused bytes in between is cheaper than another round trip
 location_shop_order = [Regions.shop_to_location_table.keys()] + [Regions.retro_shops.keys()]
 location_shop_ids = {0x0112, 0x0110, 0x010F, 0x00FF, 0x011F, 0x0109, 0x0115}
 
@@ -350,6 +359,33 @@ location_table_misc = {'Bottle Merchant': (0x3c9, 0x2),
                        "Link's Uncle": (0x3c6, 0x1),
                        'Hobo': (0x3c9, 0x1)}
 
+def index_location_bits(bits, offset, mask, location):
+    # bit positions count up from SAVEDATA_START, little endian like the room flags words
+    for bit in range(mask.bit_length()):
+        if mask & (1 << bit):
+            bits[offset * 8 + bit] = location
+
+location_bits = {}
+for location, (roomid, mask) in location_table_uw.items():
+    index_location_bits(location_bits, roomid * 2, mask, location)
+for location, screenid in location_table_ow.items():
+    index_location_bits(location_bits, 0x280 + screenid, 0x40, location)
+for location, mask in location_table_npc.items():
+    index_location_bits(location_bits, 0x410, mask, location)
+for location, (offset, mask) in location_table_misc.items():
+    index_location_bits(location_bits, offset, mask, location)
+shop_location_bits = {}
+for cnt in range(SHOP_SRAM_LEN):
+    if 0x400000 + cnt in Regions.shop_table_by_location_id:
+        index_location_bits(shop_location_bits, SHOP_ADDR - SAVEDATA_START + cnt, 0xFF, Regions.shop_table_by_location_id[0x400000 + cnt])
+location_bits_mask = sum(1 << bit for bit in location_bits)
+shop_location_bits_mask = sum(1 << bit for bit in shop_location_bits)
+tracked_savedata_size = max(max(location_bits), max(shop_location_bits)) // 8 + 1
+
+uw_locations_by_room = {}
+for location, (roomid, mask) in location_table_uw.items():
+    uw_locations_by_room.setdefault(roomid, []).append((location, mask))
+
 SNES_DISCONNECTED = 0
 SNES_CONNECTING = 1
 SNES_CONNECTED = 2
@@ -513,6 +549,28 @@ async def snes_read(ctx : Context, address, size):
     finally:
         ctx.snes_request_lock.release()
 
+async def snes_read_ranges(ctx : Context, reads):
+    """Read a dict of name: (address, size) with as few requests as possible, merging ranges that are close together"""
+    blocks = []
+    for address, size in sorted(reads.values()):
+        if blocks and address <= blocks[-1][0] + blocks[-1][1] + SNES_READ_MERGE_GAP:
+            blocks[-1][1] = max(blocks[-1][1], address + size - blocks[-1][0])
+        else:
+            blocks.append([address, size])
+
+    block_data = []
+    for address, size in blocks:
+        block_data.append((address, size, await snes_read(ctx, address, size)))
+
+    data = {}
+    for name, (address, size) in reads.items():
+        for block_address, block_size, block in block_data:
+            if block_address <= address < block_address + block_size:
+                offset = address - block_address
+                data[name] = block[offset:offset + size] if block is not None else None
+                break
+    return data
+
 async def snes_write(ctx : Context, write_list):
     try:
         await ctx.snes_request_lock.acquire()
@@ -532,11 +590,7 @@ async def snes_write(ctx : Context, write_list):
                 if (address < WRAM_START) or ((address + len(data)) > (WRAM_START + WRAM_SIZE)):
                     logging.error("SD2SNES: Write out of range %s (%d)" % (hex(address), len(data)))
                     return False
-                for ptr, byte in enumerate(data, address + 0x7E0000 - WRAM_START):
-                    cmd += b'\xA9' # LDA
-                    cmd += bytes([byte])
-                    cmd += b'\x8F' # STA.l
-                    cmd += bytes([ptr & 0xFF, (ptr >> 8) & 0xFF, (ptr >> 16) & 0xFF])
+            cmd += sd2snes_write_code(write_list)
 
             cmd += b'\xA9\x00\x8F\x00\x2C\x00\x68\xEB\x68\x28\x6C\xEA\xFF\x08'
 
@@ -566,6 +620,30 @@ async def snes_write(ctx : Context, write_list):
     finally:
         ctx.snes_request_lock.release()
 
+def sd2snes_write_code(write_list):
+    """Assemble 65816 code writing each (address, data) to wram, entered and left with an 8 bit accumulator"""
+    code = b''
+    wide = False
+    acc = [None, None]
+    for address, data in write_list:
+        ptr = address + 0x7E0000 - WRAM_START
+        # store 16 bits at a time, an odd run ends with a store overlapping the previous one
+        stores = [(ptr + i, data[i:i + 2]) for i in range(0, len(data) - 1, 2)]
+        if len(data) % 2:
+            stores.append((ptr + len(data) - 2, data[-2:]) if len(data) > 1 else (ptr, data))
+        for store_ptr, value in stores:
+            if wide != (len(value) == 2):
+                wide = len(value) == 2
+                code += b'\xC2\x20' if wide else b'\xE2\x20' # REP #$20 / SEP #$20
+            if acc[:len(value)] != list(value):
+                code += b'\xA9' + value # LDA
+                acc[:len(value)] = list(value)
+            code += b'\x8F' # STA.l
+            code += bytes([store_ptr & 0xFF, (store_ptr >> 8) & 0xFF, (store_ptr >> 16) & 0xFF])
+    if wide:
+        code += b'\xE2\x20'
+    return code
+
 def snes_buffered_write(ctx : Context, address, data):
     if len(ctx.snes_write_buffer) > 0 and (ctx.snes_write_buffer[-1][0] + len(ctx.snes_write_buffer[-1][1])) == address:
         ctx.snes_write_buffer[-1] = (ctx.snes_write_buffer[-1][0], ctx.snes_write_buffer[-1][1] + data)
@@ -774,6 +852,15 @@ async def console_loop(ctx : Context):
         if command[0][:1] != '/':
             asyncio.create_task(send_msgs(ctx.socket, [['Say', input]]))
 
+        if command[0] == '/stats':
+            tick_times = sorted(ctx.watcher_tick_times)
+            if tick_times:
+                logging.info('Polling every %.2fs, snes read time per tick: last %.1fms, median %.1fms, max %.1fms over %d ticks' % (
+                    ctx.watcher_interval, ctx.watcher_tick_times[-1] * 1000, tick_times[len(tick_times) // 2] * 1000,
+                    tick_times[-1] * 1000, len(tick_times)))
+            else:
+                logging.info('Polling every %.2fs, not in game yet' % ctx.watcher_interval)
+
         if command[0] == '/received':
             logging.info('Received items:')
             for index, item in enumerate(ctx.items_received, 1):
@@ -824,18 +911,6 @@ def filter_location(ctx, location):
 async def track_locations(ctx : Context, roomid, roomdata):
     new_locations = []
 
-    if ctx.total_locations is None:
-        total_data = await snes_read(ctx, DYNAMIC_TOTAL_ADDR, 2)
-        ttl = total_data[0] | (total_data[1] << 8)
-        if ttl > 0:
-            ctx.total_locations = ttl
-
-    if ctx.mode_flags is None:
-        flags = await snes_read(ctx, MODE_FLAGS, 1)
-        ctx.key_drop_mode = flags[0] & 0x1
-        ctx.shop_mode = flags[0] & 0x2
-        ctx.retro_mode = flags[0] & 0x4
-
     def new_check(location):
         ctx.locations_checked.add(location)
         ignored = filter_location(ctx, location)
@@ -845,87 +920,73 @@ async def track_locations(ctx : Context, roomid, roomdata):
             logging.info(f"New check: {location} ({len(ctx.locations_checked)-ctx.ignore_count}/{ctx.total_locations})")
             new_locations.append(Regions.lookup_name_to_id[location])
 
-    try:
-        if ctx.shop_mode or ctx.retro_mode:
-            misc_data = await snes_read(ctx, SHOP_ADDR, SHOP_SRAM_LEN)
-            for cnt, b in enumerate(misc_data):
-                my_check = Regions.shop_table_by_location_id[0x400000 + cnt]
-                if int(b) > 0 and my_check not in ctx.locations_checked:
-                    new_check(my_check)
-    except Exception as e:
-        print(e)
-        logging.warning(e)
+    reads = {'savedata': (SAVEDATA_START, tracked_savedata_size)}
+    if ctx.total_locations is None:
+        reads['total'] = (DYNAMIC_TOTAL_ADDR, 2)
+    if ctx.mode_flags is None:
+        reads['flags'] = (MODE_FLAGS, 1)
+    data = await snes_read_ranges(ctx, reads)
 
-    for location, (loc_roomid, loc_mask) in location_table_uw.items():
-        if location not in ctx.locations_checked and loc_roomid == roomid and (roomdata << 4) & loc_mask != 0:
-            new_check(location)
+    total_data = data.get('total')
+    if total_data is not None:
+        ttl = total_data[0] | (total_data[1] << 8)
+        if ttl > 0:
+            ctx.total_locations = ttl
 
-    uw_begin = 0x129
-    uw_end = 0
-    uw_unchecked = {}
-    for location, (roomid, mask) in location_table_uw.items():
-        if location not in ctx.locations_checked:
-            uw_unchecked[location] = (roomid, mask)
-            uw_begin = min(uw_begin, roomid)
-            uw_end = max(uw_end, roomid + 1)
-    if uw_begin < uw_end:
-        uw_data = await snes_read(ctx, SAVEDATA_START + (uw_begin * 2), (uw_end - uw_begin) * 2)
-        if uw_data is not None:
-            for location, (roomid, mask) in uw_unchecked.items():
-                offset = (roomid - uw_begin) * 2
-                roomdata = uw_data[offset] | (uw_data[offset + 1] << 8)
-                if roomdata & mask != 0:
-                    new_check(location)
+    flags = data.get('flags')
+    if flags is not None:
+        ctx.key_drop_mode = flags[0] & 0x1
+        ctx.shop_mode = flags[0] & 0x2
+        ctx.retro_mode = flags[0] & 0x4
 
-    ow_begin = 0x82
-    ow_end = 0
-    ow_unchecked = {}
-    for location, screenid in location_table_ow.items():
-        if location not in ctx.locations_checked:
-            ow_unchecked[location] = screenid
-            ow_begin = min(ow_begin, screenid)
-            ow_end = max(ow_end, screenid + 1)
-    if ow_begin < ow_end:
-        ow_data = await snes_read(ctx, SAVEDATA_START + 0x280 + ow_begin, ow_end - ow_begin)
-        if ow_data is not None:
-            for location, screenid in ow_unchecked.items():
-                if ow_data[screenid - ow_begin] & 0x40 != 0:
-                    new_check(location)
+    for location, mask in uw_locations_by_room.get(roomid, []):
+        if location not in ctx.locations_checked and (roomdata << 4) & mask != 0:
+            new_check(location)
 
-    if not all([location in ctx.locations_checked for location in location_table_npc.keys()]):
-        npc_data = await snes_read(ctx, SAVEDATA_START + 0x410, 2)
-        if npc_data is not None:
-            npc_value = npc_data[0] | (npc_data[1] << 8)
-            for location, mask in location_table_npc.items():
-                if npc_value & mask != 0 and location not in ctx.locations_checked:
+    if data['savedata'] is not None:
+        # only bits that were set since the last snapshot can be new checks
+        savedata = int.from_bytes(data['savedata'], 'little')
+        changed = savedata & ~ctx.savedata_snapshot
+        ctx.savedata_snapshot = savedata
+        shop_changed = changed & shop_location_bits_mask if ctx.shop_mode or ctx.retro_mode else 0
+        for bits, new_bits in [(location_bits, changed & location_bits_mask), (shop_location_bits, shop_changed)]:
+            while new_bits:
+                bit = new_bits & -new_bits
+                location = bits[bit.bit_length() - 1]
+                if location not in ctx.locations_checked:
                     new_check(location)
+                new_bits ^= bit
 
-    if not all([location in ctx.locations_checked for location in location_table_misc.keys()]):
-        misc_data = await snes_read(ctx, SAVEDATA_START + 0x3c6, 4)
-        if misc_data is not None:
-            for location, (offset, mask) in location_table_misc.items():
-                assert(0x3c6 <= offset <= 0x3c9)
-                if misc_data[offset - 0x3c6] & mask != 0 and location not in ctx.locations_checked:
-                    new_check(location)
+    if new_locations:
+        await send_msgs(ctx.socket, [['LocationChecks', new_locations]])
 
-    await send_msgs(ctx.socket, [['LocationChecks', new_locations]])
+def update_watcher_interval(ctx : Context, state):
+    # poll quickly while the game state keeps changing, back off to the idle interval once it settles
+    if state is not None and state != ctx.watcher_last_state:
+        ctx.watcher_interval = WATCHER_ACTIVE_INTERVAL
+    else:
+        ctx.watcher_interval = min(ctx.watcher_interval * 2, WATCHER_IDLE_INTERVAL)
+    ctx.watcher_last_state = state
 
 async def game_watcher(ctx : Context):
     while not ctx.exit_event.is_set():
         try:
-            await asyncio.wait_for(ctx.watcher_event.wait(), 2)
+            await asyncio.wait_for(ctx.watcher_event.wait(), ctx.watcher_interval)
         except asyncio.TimeoutError:
             pass
         ctx.watcher_event.clear()
+        tick_start = time.perf_counter()
 
         if not ctx.rom:
             rom = await snes_read(ctx, ROMNAME_START, ROMNAME_SIZE)
             if rom is None or rom == bytes([0] * ROMNAME_SIZE):
+                update_watcher_interval(ctx, None)
                 continue
 
             ctx.rom = list(rom)
             ctx.locations_checked = set()
             ctx.locations_scouted = set()
+            ctx.savedata_snapshot = 0
             if ctx.awaiting_rom:
                 await server_auth(ctx, False)
 
@@ -935,10 +996,12 @@ async def game_watcher(ctx : Context):
 
         gamemode = await snes_read(ctx, WRAM_START + 0x10, 1)
         if gamemode is None or gamemode[0] not in INGAME_MODES:
+            update_watcher_interval(ctx, None)
             continue
 
         data = await snes_read(ctx, RECV_PROGRESS_ADDR, 8)
         if data is None:
+            update_watcher_interval(ctx, None)
             continue
 
         recv_index = data[0] | (data[1] << 8)
@@ -972,6 +1035,8 @@ async def game_watcher(ctx : Context):
             logging.info(f'Scouting item at {list(Regions.lookup_id_to_name.keys())[scout_location - 1]}')
             await send_msgs(ctx.socket, [['LocationScouts', [scout_location]]])
         await track_locations(ctx, roomid, roomdata)
+        ctx.watcher_tick_times.append(time.perf_counter() - tick_start)
+        update_watcher_interval(ctx, (data, ctx.savedata_snapshot))
 
 async def main():
     parser = argparse.ArgumentParser()
@@ -4,8 +4,10 @@ import asyncio
 import functools
 import json
 import logging
+import os
 import re
 import shlex
+import time
 import urllib.request
 import websockets
 import zlib
@@ -14,6 +16,16 @@ import Items
 import Regions
 from MultiClient import ReceivedItem, get_item_name_from_id, get_location_name_from_address
 
+# scouts address locations by their 1-based position in Regions.lookup_id_to_name
+scout_location_ids = list(Regions.lookup_id_to_name.keys())
+scout_item_types = {}
+for item_data in Items.item_table.values():
+    if type(item_data[3]) is int:
+        scout_item_types.setdefault(item_data[3], item_data[2])
+scout_item_replacements = {'SmallKey': 0xA2, 'BigKey': 0x9D, 'Compass': 0x8D, 'Map': 0x7D}
+
+send_queue_size = 256
+
 class Client:
     def __init__(self, socket):
         self.socket = socket
@@ -22,12 +34,20 @@ class Client:
         self.team = None
         self.slot = None
         self.send_index = 0
+        self.send_queue = asyncio.Queue(send_queue_size)
+        self.send_queue_peak = 0
+        self.sent_payloads = 0
+        self.dropped_payloads = 0
 
 class Context:
     def __init__(self, host, port, password):
         self.data_filename = None
         self.save_filename = None
         self.disable_save = False
+        self.save_interval = 10
+        self.save_journal = None
+        self.journal_entries = 0
+        self.journal_dirty = False
         self.player_names = {}
         self.rom_names = {}
         self.remote_items = set()
@@ -39,6 +59,7 @@ class Context:
         self.countdown_timer = 0
         self.clients = []
         self.received_items = {}
+        self.received_keys = {}
 
 async def send_msgs(websocket, msgs):
     if not websocket or not websocket.open or websocket.closed:
@@ -48,15 +69,38 @@ async def send_msgs(websocket, msgs):
     except websockets.ConnectionClosed:
         pass
 
+def queue_payload(client : Client, payload, droppable=True):
+    if client.send_queue.full():
+        if droppable:
+            client.dropped_payloads += 1
+            return
+        # the client can't keep up with messages it must not miss, it will resync on reconnect
+        logging.warning(f"Disconnecting {client.name or 'client'}, its send queue is full")
+        asyncio.create_task(client.socket.close())
+        return
+    client.send_queue.put_nowait(payload)
+    client.send_queue_peak = max(client.send_queue_peak, client.send_queue.qsize())
+
+async def client_sender(client : Client):
+    while True:
+        payload = await client.send_queue.get()
+        try:
+            await client.socket.send(payload)
+        except websockets.ConnectionClosed:
+            return
+        client.sent_payloads += 1
+
 def broadcast_all(ctx : Context, msgs):
+    payload = json.dumps(msgs)
     for client in ctx.clients:
         if client.auth:
-            asyncio.create_task(send_msgs(client.socket, msgs))
+            queue_payload(client, payload)
 
 def broadcast_team(ctx : Context, team, msgs):
+    payload = json.dumps(msgs)
     for client in ctx.clients:
         if client.auth and client.team == team:
-            asyncio.create_task(send_msgs(client.socket, msgs))
+            queue_payload(client, payload)
 
 def notify_all(ctx : Context, text):
     logging.info("Notice (all): %s" % text)
@@ -70,11 +114,12 @@ def notify_client(client : Client, text : str):
     if not client.auth:
         return
     logging.info("Notice (Player %s in team %d): %s" % (client.name, client.team+1, text))
-    asyncio.create_task(send_msgs(client.socket,  [['Print', text]]))
+    queue_payload(client, json.dumps([['Print', text]]))
 
 async def server(websocket, path, ctx : Context):
     client = Client(websocket)
     ctx.clients.append(client)
+    sender = asyncio.create_task(client_sender(client))
 
     try:
         await on_client_connected(ctx, client)
@@ -93,6 +138,7 @@ async def server(websocket, path, ctx : Context):
     finally:
         await on_client_disconnected(ctx, client)
         ctx.clients.remove(client)
+        sender.cancel()
 
 async def on_client_connected(ctx : Context, client : Client):
     await send_msgs(client.socket, [['RoomInfo', {
@@ -141,6 +187,13 @@ def get_connected_players_string(ctx : Context):
 def get_received_items(ctx : Context, team, player):
     return ctx.received_items.setdefault((team, player), [])
 
+def get_received_keys(ctx : Context, team, player):
+    # (location, sender) of every item received, built from the list the first time so loaded saves are covered
+    keys = ctx.received_keys.get((team, player))
+    if keys is None:
+        keys = ctx.received_keys[(team, player)] = {(item.location, item.player) for item in get_received_items(ctx, team, player)}
+    return keys
+
 def tuplize_received_items(items):
     return [(item.item, item.location, item.player) for item in items]
 
@@ -150,7 +203,7 @@ def send_new_items(ctx : Context):
             continue
         items = get_received_items(ctx, client.team, client.slot)
         if len(items) > client.send_index:
-            asyncio.create_task(send_msgs(client.socket, [['ReceivedItems', (client.send_index, tuplize_received_items(items)[client.send_index:])]]))
+            queue_payload(client, json.dumps([['ReceivedItems', (client.send_index, tuplize_received_items(items)[client.send_index:])]]), droppable=False)
             client.send_index = len(items)
 
 def forfeit_player(ctx : Context, team, slot):
@@ -160,34 +213,99 @@ def forfeit_player(ctx : Context, team, slot):
     register_location_checks(ctx, team, slot, all_locations)
 
 def register_location_checks(ctx : Context, team, slot, locations):
-    found_items = False
     for location in locations:
         if (location, slot) in ctx.locations:
             target_item, target_player = ctx.locations[(location, slot)]
             if target_player != slot or slot in ctx.remote_items:
-                found = False
-                recvd_items = get_received_items(ctx, team, target_player)
-                for recvd_item in recvd_items:
-                    if recvd_item.location == location and recvd_item.player == slot:
-                        found = True
-                        break
-                if not found:
+                if (location, slot) not in get_received_keys(ctx, team, target_player):
                     new_item = ReceivedItem(target_item, location, slot)
-                    recvd_items.append(new_item)
+                    add_received_item(ctx, team, target_player, new_item)
                     if slot != target_player:
                         broadcast_team(ctx, team, [['ItemSent', (slot, location, target_player, target_item)]])
                     logging.info('(Team #%d) %s sent %s to %s (%s)' % (team+1, ctx.player_names[(team, slot)], get_item_name_from_id(target_item), ctx.player_names[(team, target_player)], get_location_name_from_address(location)))
-                    found_items = True
     send_new_items(ctx)
 
-    if found_items and not ctx.disable_save:
-        try:
-            with open(ctx.save_filename, "wb") as f:
-                jsonstr = json.dumps((list(ctx.rom_names.items()),
-                                      [(k, [i.__dict__ for i in v]) for k, v in ctx.received_items.items()]))
-                f.write(zlib.compress(jsonstr.encode("utf-8")))
-        except Exception as e:
-            logging.exception(e)
+journal_compaction_entries = 1000
+
+def add_received_item(ctx : Context, team, player, item : ReceivedItem):
+    get_received_keys(ctx, team, player).add((item.location, item.player))
+    items = get_received_items(ctx, team, player)
+    items.append(item)
+    if ctx.save_journal:
+        # the index makes replaying idempotent, should the journal outlive a compaction
+        ctx.save_journal.write(json.dumps([team, player, len(items) - 1, item.__dict__]) + '\n')
+        ctx.journal_entries += 1
+        ctx.journal_dirty = True
+
+def get_journal_filename(ctx : Context):
+    return ctx.save_filename + '_journal'
+
+def save_snapshot(ctx : Context):
+    temp_filename = ctx.save_filename + '_tmp'
+    with open(temp_filename, "wb") as f:
+        jsonstr = json.dumps((list(ctx.rom_names.items()),
+                              [(k, [i.__dict__ for i in v]) for k, v in ctx.received_items.items()]))
+        f.write(zlib.compress(jsonstr.encode("utf-8")))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_filename, ctx.save_filename)
+    if ctx.save_journal:
+        ctx.save_journal.close()
+    ctx.save_journal = open(get_journal_filename(ctx), 'w')
+    ctx.journal_entries = 0
+    ctx.journal_dirty = False
+
+def replay_save_journal(ctx : Context):
+    try:
+        with open(get_journal_filename(ctx), 'r') as f:
+            for line in f:
+                try:
+                    team, player, index, item = json.loads(line)
+                except ValueError:
+                    break  # torn final write
+                items = get_received_items(ctx, team, player)
+                if index == len(items):
+                    items.append(ReceivedItem(**item))
+    except FileNotFoundError:
+        pass
+
+def load_save(ctx : Context):
+    with open(ctx.save_filename, 'rb') as f:
+        jsonobj = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        rom_names = jsonobj[0]
+        received_items = {tuple(k): [ReceivedItem(**i) for i in v] for k, v in jsonobj[1]}
+        if not all([ctx.rom_names[tuple(rom)] == (team, slot) for rom, (team, slot) in rom_names]):
+            raise Exception('Save file mismatch')
+        ctx.received_items = received_items
+    replay_save_journal(ctx)
+
+def set_aside_save(ctx : Context):
+    # renames the snapshot and journal that failed to load so a new game can be saved next to them
+    stamp = time.strftime('%Y%m%d%H%M%S')
+    filenames = [filename for filename in [ctx.save_filename, get_journal_filename(ctx)] if os.path.exists(filename)]
+    suffix, attempt = '_bad_' + stamp, 1
+    while any(os.path.exists(filename + suffix) for filename in filenames):
+        attempt += 1
+        suffix = '_bad_%s_%d' % (stamp, attempt)
+    for filename in filenames:
+        os.rename(filename, filename + suffix)
+    return [filename + suffix for filename in filenames]
+
+def sync_save(ctx : Context, compact=False):
+    try:
+        if compact or ctx.journal_entries >= journal_compaction_entries:
+            save_snapshot(ctx)
+        elif ctx.journal_dirty:
+            ctx.save_journal.flush()
+            os.fsync(ctx.save_journal.fileno())
+            ctx.journal_dirty = False
+    except Exception as e:
+        logging.exception(e)
+
+async def save_journal_sync(ctx : Context):
+    while ctx.save_journal:
+        await asyncio.sleep(ctx.save_interval)
+        sync_save(ctx)
 
 async def process_client_cmd(ctx : Context, client : Client, cmd, args):
     if type(cmd) is not str:
@@ -249,16 +367,13 @@ async def process_client_cmd(ctx : Context, client : Client, cmd, args):
             return
         locs = []
         for location in args:
-            if type(location) is not int or 0 >= location > len(Regions.lookup_id_to_name.keys()):
+            if type(location) is not int or not 0 < location <= len(scout_location_ids):
                 await send_msgs(client.socket, [['InvalidArguments', 'LocationScouts']])
                 return
-            loc_name = list(Regions.lookup_id_to_name.keys())[location - 1]
-            target_item, target_player = ctx.locations[(Regions.lookup_name_to_id[loc_name], client.slot)]
-
-            replacements = {'SmallKey': 0xA2, 'BigKey': 0x9D, 'Compass': 0x8D, 'Map': 0x7D}
-            item_type = [i[2] for i in Items.item_table.values() if type(i[3]) is int and i[3] == target_item]
-            if item_type:
-                target_item = replacements.get(item_type[0], target_item)
+            loc_id = scout_location_ids[location - 1]
+            loc_name = Regions.lookup_id_to_name[loc_id]
+            target_item, target_player = ctx.locations[(loc_id, client.slot)]
+            target_item = scout_item_replacements.get(scout_item_types.get(target_item), target_item)
 
             locs.append([loc_name, location, target_item, target_player])
 
@@ -297,10 +412,18 @@ async def console(ctx : Context):
 
         if command[0] == '/exit':
             ctx.server.ws_server.close()
+            if ctx.save_journal:
+                sync_save(ctx, compact=True)
+                ctx.save_journal.close()
+                ctx.save_journal = None
             break
 
         if command[0] == '/players':
             logging.info(get_connected_players_string(ctx))
+        if command[0] == '/queues':
+            for client in ctx.clients:
+                logging.info(f"{client.name or 'unauthenticated'}: {client.send_queue.qsize()} queued, peak {client.send_queue_peak}, "
+                             f"{client.sent_payloads} sent, {client.dropped_payloads} dropped")
         if command[0] == '/password':
             set_password(ctx, command[1] if len(command) > 1 else None)
         if command[0] == '/kick' and len(command) > 1:
@@ -330,7 +453,7 @@ async def console(ctx : Context):
                 for client in ctx.clients:
                     if client.auth and client.name.lower() == player.lower():
                         new_item = ReceivedItem(Items.item_table[item][3], "cheat console", client.slot)
-                        get_received_items(ctx, client.team, client.slot).append(new_item)
+                        add_received_item(ctx, client.team, client.slot, new_item)
                         notify_all(ctx, 'Cheat console: sending "' + item + '" to ' + client.name)
                 send_new_items(ctx)
             else:
@@ -339,6 +462,16 @@ async def console(ctx : Context):
         if command[0][0] != '/':
             notify_all(ctx, '[Server]: ' + input)
 
+def load_multidata(ctx : Context, filename):
+    with open(filename, 'rb') as f:
+        jsonobj = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        for team, names in enumerate(jsonobj['names']):
+            for player, name in enumerate(names, 1):
+                ctx.player_names[(team, player)] = name
+        ctx.rom_names = {tuple(rom): (team, slot) for slot, team, rom in jsonobj['roms']}
+        ctx.remote_items = set(jsonobj['remote_items'])
+        ctx.locations = {tuple(k): tuple(v) for k, v in jsonobj['locations']}
+
 async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--host', default=None)
@@ -347,6 +480,7 @@ async def main():
     parser.add_argument('--multidata', default=None)
     parser.add_argument('--savefile', default=None)
     parser.add_argument('--disable_save', default=False, action='store_true')
+    parser.add_argument('--save_interval', default=10, type=float, help='Seconds between flushing the save journal to disk')
     parser.add_argument('--loglevel', default='info', choices=['debug', 'info', 'warning', 'error', 'critical'])
     args = parser.parse_args()
 
@@ -364,14 +498,7 @@ async def main():
             root.withdraw()
             ctx.data_filename = tkinter.filedialog.askopenfilename(filetypes=(("Multiworld data","*multidata"),))
 
-        with open(ctx.data_filename, 'rb') as f:
-            jsonobj = json.loads(zlib.decompress(f.read()).decode("utf-8"))
-            for team, names in enumerate(jsonobj['names']):
-                for player, name in enumerate(names, 1):
-                    ctx.player_names[(team, player)] = name
-            ctx.rom_names = {tuple(rom): (team, slot) for slot, team, rom in jsonobj['roms']}
-            ctx.remote_items = set(jsonobj['remote_items'])
-            ctx.locations = {tuple(k): tuple(v) for k, v in jsonobj['locations']}
+        load_multidata(ctx, ctx.data_filename)
     except Exception as e:
         logging.error('Failed to read multiworld data (%s)' % e)
         return
@@ -383,19 +510,33 @@ async def main():
     if not ctx.disable_save:
         if not ctx.save_filename:
             ctx.save_filename = (ctx.data_filename[:-9] if ctx.data_filename[-9:] == 'multidata' else (ctx.data_filename + '_')) + 'multisave'
+        failure = None
         try:
-            with open(ctx.save_filename, 'rb') as f:
-                jsonobj = json.loads(zlib.decompress(f.read()).decode("utf-8"))
-                rom_names = jsonobj[0]
-                received_items = {tuple(k): [ReceivedItem(**i) for i in v] for k, v in jsonobj[1]}
-                if not all([ctx.rom_names[tuple(rom)] == (team, slot) for rom, (team, slot) in rom_names]):
-                    raise Exception('Save file mismatch, will start a new game')
-                ctx.received_items = received_items
-                logging.info('Loaded save file with %d received items for %d players' % (sum([len(p) for p in received_items.values()]), len(received_items)))
+            load_save(ctx)
+            logging.info('Loaded save file with %d received items for %d players' % (sum([len(p) for p in ctx.received_items.values()]), len(ctx.received_items)))
         except FileNotFoundError:
-            logging.error('No save data found, starting a new game')
+            if os.path.exists(get_journal_filename(ctx)):
+                failure = 'found a save journal without its save file'
+            else:
+                logging.error('No save data found, starting a new game')
         except Exception as e:
-            logging.info(e)
+            failure = e
+        if failure is not None:
+            # the old files may be the only copy of what was received, so they are kept under a new name
+            ctx.received_items = {}
+            try:
+                moved = set_aside_save(ctx)
+            except OSError as e:
+                logging.error('Failed to load save file (%s) and could not move it away (%s), move %s and its journal away to start a new game' % (failure, e, ctx.save_filename))
+                return
+            logging.error('Failed to load save file (%s), moved it to %s and started a new game' % (failure, ' and '.join(moved)))
+        ctx.save_interval = args.save_interval
+        try:
+            save_snapshot(ctx)
+        except Exception as e:
+            logging.error('Failed to write save file %s (%s)' % (ctx.save_filename, e))
+            return
+        asyncio.create_task(save_journal_sync(ctx))
 
     ctx.server = websockets.serve(functools.partial(server,ctx=ctx), ctx.host, ctx.port, ping_timeout=None, ping_interval=None)
     await ctx.server
@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+import zlib
+
+import websockets
+
+import MultiServer
+
+
+def rom_name(slot):
+    return list(f'LOADTEST{slot:05}'.encode())
+
+def write_multidata(filename, players, seed):
+    rng = random.Random(seed)
+    item_codes = sorted(MultiServer.scout_item_types)
+    locations = []
+    for slot in range(1, players + 1):
+        others = [p for p in range(1, players + 1) if p != slot]
+        for location in MultiServer.scout_location_ids:
+            # every item goes to another player so each check is answered with an ItemSent
+            locations.append([[location, slot], [rng.choice(item_codes), rng.choice(others)]])
+    jsonobj = {
+        'names': [[f'Player{slot}' for slot in range(1, players + 1)]],
+        'roms': [[slot, 0, rom_name(slot)] for slot in range(1, players + 1)],
+        'remote_items': [],
+        'locations': locations
+    }
+    with open(filename, 'wb') as f:
+        f.write(zlib.compress(json.dumps(jsonobj).encode("utf-8")))
+
+def run_server(filename, pipe):
+    logging.basicConfig(format='[%(asctime)s] %(message)s', level=logging.WARNING)
+    asyncio.run(serve(filename, pipe))
+
+async def serve(filename, pipe):
+    ctx = MultiServer.Context('localhost', 0, None)
+    ctx.disable_save = True
+    MultiServer.load_multidata(ctx, filename)
+    ctx.server = await websockets.serve(functools.partial(MultiServer.server, ctx=ctx), ctx.host, ctx.port, ping_timeout=None, ping_interval=None)
+    pipe.send(ctx.server.sockets[0].getsockname()[1])
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, pipe.recv)
+    cpu = time.process_time()
+    await loop.run_in_executor(None, pipe.recv)
+    pipe.send(time.process_time() - cpu)
+    ctx.server.close()
+
+class StandInClient:
+    def __init__(self, slot, rng):
+        self.slot = slot
+        self.rng = rng
+        self.socket = None
+        self.pending_checks = {}
+        self.pending_scouts = []
+        self.pending_says = {}
+        self.latencies = {'LocationChecks': [], 'LocationScouts': [], 'Say': []}
+        self.unchecked = list(MultiServer.scout_location_ids)
+        rng.shuffle(self.unchecked)
+
+    async def connect(self, port):
+        self.socket = await websockets.connect(f'ws://localhost:{port}', ping_timeout=None, ping_interval=None)
+        await self.socket.send(json.dumps([['Connect', {'password': None, 'rom': rom_name(self.slot)}]]))
+        while not any(cmd == 'Connected' for cmd, *_ in json.loads(await self.socket.recv())):
+            pass
+
+    async def receive(self):
+        try:
+            async for data in self.socket:
+                now = time.perf_counter()
+                for cmd, *args in json.loads(data):
+                    if cmd == 'ItemSent' and args[0][0] == self.slot:
+                        self.resolve(self.pending_checks.pop(args[0][1], None), now)
+                    elif cmd == 'LocationInfo' and self.pending_scouts:
+                        self.resolve(self.pending_scouts.pop(0), now)
+                    elif cmd == 'Print':
+                        self.resolve(self.pending_says.pop(args[0].rsplit(' ', 1)[-1], None), now)
+        except websockets.ConnectionClosed:
+            pass
+
+    def resolve(self, request, now):
+        if request is not None:
+            cmd, sent, done = request
+            self.latencies[cmd].append(now - sent)
+            done.set_result(None)
+
+    async def send(self, cmd, args):
+        done = asyncio.get_running_loop().create_future()
+        request = (cmd, time.perf_counter(), done)
+        if cmd == 'LocationChecks':
+            self.pending_checks[args[0]] = request
+        elif cmd == 'LocationScouts':
+            self.pending_scouts.append(request)
+        else:
+            self.pending_says[args.rsplit(' ', 1)[-1]] = request
+        await self.socket.send(json.dumps([[cmd, args]]))
+        await done
+
+    async def play(self, events, delay):
+        receiver = asyncio.create_task(self.receive())
+        for event in range(events):
+            roll = self.rng.random()
+            if roll < 0.6 and self.unchecked:
+                await self.send('LocationChecks', [self.unchecked.pop()])
+            elif roll < 0.85:
+                await self.send('LocationScouts', [self.rng.randint(1, len(MultiServer.scout_location_ids))])
+            else:
+                await self.send('Say', f'chatter {self.slot}-{event}')
+            if delay:
+                await asyncio.sleep(self.rng.uniform(0, delay * 2))
+        await self.socket.close()
+        await receiver
+
+async def run_clients(port, args, pipe):
+    rng = random.Random(args.seed)
+    clients = [StandInClient(slot, random.Random(rng.getrandbits(32))) for slot in range(1, args.clients + 1)]
+    await asyncio.gather(*[client.connect(port) for client in clients])
+
+    pipe.send('start')
+    start = time.perf_counter()
+    await asyncio.gather(*[client.play(args.events, args.delay) for client in clients])
+    elapsed = time.perf_counter() - start
+    pipe.send('stop')
+    return clients, elapsed
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(p * len(values)))] if values else 0
+
+def report(clients, elapsed, server_cpu):
+    latencies = {cmd: sorted(sum([client.latencies[cmd] for client in clients], [])) for cmd in clients[0].latencies}
+    latencies['all'] = sorted(sum(latencies.values(), []))
+    events = len(latencies['all'])
+    print(f'{len(clients)} clients, {events} events in {elapsed:.2f}s ({events / elapsed:.0f} events/s)')
+    for cmd, values in latencies.items():
+        print(f'{cmd:>15}: {len(values):6} events, p50 {percentile(values, 0.5) * 1000:7.2f}ms, p99 {percentile(values, 0.99) * 1000:7.2f}ms')
+    print(f'Server CPU: {server_cpu:.2f}s total, {server_cpu / max(events, 1) * 1000000:.0f}us per event')
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tempdir:
+        filename = os.path.join(tempdir, 'LoadTest_multidata')
+        write_multidata(filename, args.clients, args.seed)
+
+        pipe, server_pipe = multiprocessing.Pipe()
+        server = multiprocessing.Process(target=run_server, args=(filename, server_pipe))
+        server.start()
+        try:
+            port = pipe.recv()
+            clients, elapsed = asyncio.run(run_clients(port, args, pipe))
+            server_cpu = pipe.recv()
+        finally:
+            server.join(10)
+            if server.is_alive():
+                server.terminate()
+
+    report(clients, elapsed, server_cpu)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure MultiServer latency and CPU with local stand-in clients.')
+    parser.add_argument('--clients', default=8, type=lambda value: max(int(value), 2), help='Number of connected clients (at least 2)')
+    parser.add_argument('--events', default=200, type=int, help='Messages sent by each client')
+    parser.add_argument('--delay', default=0, type=float, help='Average seconds a client waits between messages')
+    parser.add_argument('--seed', default=0, type=int)
+    main(parser.parse_args())
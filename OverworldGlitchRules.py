@@ -2,7 +2,7 @@
 Helper functions to deliver entrance/exit/region sets to OWG rules.
 """
 
-from BaseClasses import Entrance
+from BaseClasses import Entrance, any_of
 
 
 def get_sword_required_superbunny_mirror_regions():
@@ -264,8 +264,7 @@ def overworld_glitches_rules(world, player):
 
 
 def add_alternate_rule(entrance, rule):
-    old_rule = entrance.access_rule
-    entrance.access_rule = lambda state: old_rule(state) or rule(state)
+    entrance.access_rule = any_of(entrance.access_rule, rule)
 
 
 def create_no_logic_connections(player, world, connections):
@@ -6,6 +6,7 @@ import hashlib
 import logging
 import os
 import RaceRandom as random
+import shutil
 import struct
 import sys
 import subprocess
@@ -123,16 +124,19 @@ class LocalRom(object):
         if JAP10HASH != basemd5.hexdigest():
             logging.getLogger('').warning('Supplied Base Rom does not match known MD5 for JAP(1.0) release. Will try to patch anyway.')
 
+        with open(local_path('data/base2current.bps'), 'rb') as stream:
+            patch = stream.read()
+        key = basemd5.hexdigest() + hashlib.md5(patch).hexdigest()
+        if load_base_rom(self, key):
+            return
+
         orig_buffer = self.buffer.copy()
 
         # extend to 2MB
         self.buffer.extend(bytearray([0x00] * (0x200000 - len(self.buffer))))
 
         # load randomizer patches
-        with open(local_path('data/base2current.bps'), 'rb') as stream:
-            bps.apply.apply_to_bytearrays(bps.io.read_bps(stream), orig_buffer, self.buffer)
-
-        self.create_json_patch(orig_buffer)
+        bps.apply.apply_to_bytearrays(bps.io.read_bps(io.BytesIO(patch)), orig_buffer, self.buffer)
 
         # verify md5
         patchedmd5 = hashlib.md5()
@@ -140,6 +144,9 @@ class LocalRom(object):
         if RANDOMIZERBASEHASH != patchedmd5.hexdigest():
             raise RuntimeError('Provided Base Rom unsuitable for patching. Please provide a JAP(1.0) "Zelda no Densetsu - Kamigami no Triforce (Japan).sfc" rom to use as a base.')
 
+        self.create_json_patch(orig_buffer)
+        store_base_rom(self, key)
+
     def create_json_patch(self, orig_buffer):
         # extend to 2MB
         orig_buffer.extend(bytearray([0x00] * (len(self.buffer) - len(orig_buffer))))
@@ -187,6 +194,45 @@ def write_int32s(rom, startaddress, values):
     for i, value in enumerate(values):
         write_int32(rom, startaddress + (i * 4), value)
 
+# patched base roms keyed by the md5 of the source rom and of base2current.bps
+base_rom_cache = {}
+base_json_patch_key = None
+
+
+def base_rom_cache_path(key, extension):
+    return local_path(os.path.join('data', 'cache', f'base2current_{key}.{extension}'))
+
+
+def load_base_rom(rom, key):
+    global base_json_patch_key
+    if key not in base_rom_cache:
+        image_path, json_path = base_rom_cache_path(key, 'sfc'), base_rom_cache_path(key, 'json')
+        if not os.path.isfile(image_path) or not os.path.isfile(json_path):
+            return False
+        with open(image_path, 'rb') as stream:
+            base_rom_cache[key] = stream.read()
+    if base_json_patch_key != key:
+        shutil.copyfile(base_rom_cache_path(key, 'json'), local_path('data/base2current.json'))
+        base_json_patch_key = key
+    rom.buffer = bytearray(base_rom_cache[key])
+    return True
+
+
+def store_base_rom(rom, key):
+    global base_json_patch_key
+    base_rom_cache[key] = bytes(rom.buffer)
+    base_json_patch_key = key
+    try:
+        os.makedirs(local_path(os.path.join('data', 'cache')), exist_ok=True)
+        shutil.copyfile(local_path('data/base2current.json'), base_rom_cache_path(key, 'json'))
+        # the image is moved into place last, so a cache entry is only found once it is complete
+        with open(base_rom_cache_path(key, 'sfc.tmp'), 'wb') as stream:
+            stream.write(rom.buffer)
+        os.replace(base_rom_cache_path(key, 'sfc.tmp'), base_rom_cache_path(key, 'sfc'))
+    except OSError as err:
+        logging.getLogger('').debug('Could not cache patched base rom: %s', err)
+
+
 def read_rom(stream):
     "Reads rom into bytearray and strips off any smc header"
     buffer = bytearray(stream.read())
@@ -548,9 +594,7 @@ class Sprite(object):
         return array_chunk(palette_as_colors, 15)
 
 
-def patch_rom(world, rom, player, team, enemized, is_mystery=False):
-    random.seed(world.rom_seeds[player])
-
+def distinguish_progressive_bow(world, player):
     # progressive bow silver arrow hint hack
     prog_bow_locs = world.find_items('Progressive Bow', player)
     if len(prog_bow_locs) > 1:
@@ -558,6 +602,11 @@ def patch_rom(world, rom, player, team, enemized, is_mystery=False):
         distinguished_prog_bow_loc = random.choice(prog_bow_locs)
         distinguished_prog_bow_loc.item.code = 0x65
 
+
+def patch_rom(world, rom, player, team, enemized, is_mystery=False):
+    random.seed(world.rom_seeds[player])
+    distinguish_progressive_bow(world, player)
+
     # patch items
     for location in world.get_locations():
         if location.player != player:
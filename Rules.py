@@ -4,6 +4,7 @@ from collections import deque
 
 import OverworldGlitchRules
 from BaseClasses import CollectionState, RegionType, DoorType, Entrance, CrystalBarrier, KeyRuleType
+from BaseClasses import HasItem, HasHelper, HasSmallKey, ItemRule, all_of, any_of
 from RoomData import DoorKind
 from OverworldGlitchRules import overworld_glitches_rules
 
@@ -12,7 +13,6 @@ def set_rules(world, player):
 
     if world.logic[player] == 'nologic':
         logging.getLogger('').info('WARNING! Seeds generated under this logic often require major glitches and may be impossible!')
-        world.get_region('Menu', player).can_reach_private = lambda state: True
         for exit in world.get_region('Menu', player).exits:
             exit.hide_path = True
         return
@@ -68,7 +68,7 @@ def set_rules(world, player):
 
     # if swamp and dam have not been moved we require mirror for swamp palace
     if not world.swamp_patch_required[player]:
-        add_rule(world.get_entrance('Swamp Lobby Moat', player), lambda state: state.has_Mirror(player))
+        add_rule(world.get_entrance('Swamp Lobby Moat', player), create_helper_rule('has_Mirror', player))
 
     set_bunny_rules(world, player, world.mode[player] == 'inverted')
 
@@ -106,15 +106,15 @@ def set_always_allow(spot, rule):
     spot.always_allow = rule
 
 def add_rule(spot, rule, combine='and'):
-    old_rule = spot.access_rule
+    # the new rule is tested first; region checks along the way record spoiler paths, so order is kept
     if combine == 'or':
-        spot.access_rule = lambda state: rule(state) or old_rule(state)
+        spot.access_rule = any_of(rule, spot.access_rule)
     else:
-        spot.access_rule = lambda state: rule(state) and old_rule(state)
+        spot.access_rule = all_of(rule, spot.access_rule)
 
 
 def or_rule(rule1, rule2):
-    return lambda state: rule1(state) or rule2(state)
+    return any_of(rule1, rule2)
 
 
 def add_lamp_requirement(spot, player):
@@ -123,11 +123,17 @@ def add_lamp_requirement(spot, player):
 
 def forbid_item(location, item, player):
     old_rule = location.item_rule
-    location.item_rule = lambda i: (i.name != item or i.player != player) and old_rule(i)
+    if isinstance(old_rule, ItemRule):
+        location.item_rule = ItemRule(old_rule.forbidden | {(item, player)}, old_rule.rules)
+    else:
+        location.item_rule = ItemRule([(item, player)], [old_rule])
 
 def add_item_rule(location, rule):
     old_rule = location.item_rule
-    location.item_rule = lambda item: rule(item) and old_rule(item)
+    if isinstance(old_rule, ItemRule):
+        location.item_rule = ItemRule(old_rule.forbidden, (rule,) + old_rule.rules)
+    else:
+        location.item_rule = ItemRule([], [rule, old_rule])
 
 def item_in_locations(state, item, player, locations):
     for location in locations:
@@ -146,7 +152,6 @@ def global_rules(world, player):
     add_item_rule(world.get_location('Ganon', player), lambda item: item.name == 'Triforce' and item.player == player)
 
     # we can s&q to the old man house after we rescue him. This may be somewhere completely different if caves are shuffled!
-    world.get_region('Menu', player).can_reach_private = lambda state: True
     for exit in world.get_region('Menu', player).exits:
         exit.hide_path = True
 
@@ -162,7 +167,7 @@ def global_rules(world, player):
     set_rule(world.get_location('Blacksmith', player), lambda state: state.has('Return Smith', player))
     set_rule(world.get_location('Magic Bat', player), lambda state: state.has('Magic Powder', player))
     set_rule(world.get_location('Sick Kid', player), lambda state: state.has_bottle(player))
-    set_rule(world.get_location('Library', player), lambda state: state.has_Boots(player))
+    set_rule(world.get_location('Library', player), create_helper_rule('has_Boots', player))
     set_rule(world.get_location('Mimic Cave', player), lambda state: state.has('Hammer', player))
     set_rule(world.get_location('Sahasrahla', player), lambda state: state.has('Green Pendant', player))
 
@@ -193,13 +198,13 @@ def global_rules(world, player):
     set_defeat_dungeon_boss_rule(world.get_location('Eastern Palace - Boss', player))
 
     # Desert
-    set_rule(world.get_location('Desert Palace - Torch', player), lambda state: state.has_Boots(player))
-    set_rule(world.get_entrance('Desert Wall Slide NW', player), lambda state: state.has_fire_source(player))
+    set_rule(world.get_location('Desert Palace - Torch', player), create_helper_rule('has_Boots', player))
+    set_rule(world.get_entrance('Desert Wall Slide NW', player), create_helper_rule('has_fire_source', player))
     set_defeat_dungeon_boss_rule(world.get_location('Desert Palace - Prize', player))
     set_defeat_dungeon_boss_rule(world.get_location('Desert Palace - Boss', player))
 
     # Tower of Hera
-    set_rule(world.get_location('Tower of Hera - Big Key Chest', player), lambda state: state.has_fire_source(player))
+    set_rule(world.get_location('Tower of Hera - Big Key Chest', player), create_helper_rule('has_fire_source', player))
     set_rule(world.get_entrance('Hera Big Chest Hook Path', player), lambda state: state.has('Hookshot', player))
     set_defeat_dungeon_boss_rule(world.get_location('Tower of Hera - Boss', player))
     set_defeat_dungeon_boss_rule(world.get_location('Tower of Hera - Prize', player))
@@ -211,11 +216,11 @@ def global_rules(world, player):
     set_rule(world.get_entrance('Tower Red Spears WN', player), lambda state: state.can_kill_most_things(player))
     set_rule(world.get_entrance('Tower Red Guards EN', player), lambda state: state.can_kill_most_things(player))
     set_rule(world.get_entrance('Tower Red Guards SW', player), lambda state: state.can_kill_most_things(player))
-    set_rule(world.get_entrance('Tower Altar NW', player), lambda state: state.has_sword(player))
+    set_rule(world.get_entrance('Tower Altar NW', player), create_helper_rule('has_sword', player))
     set_defeat_dungeon_boss_rule(world.get_location('Agahnim 1', player))
 
 
-    set_rule(world.get_entrance('PoD Arena Landing Bonk Path', player), lambda state: state.has_Boots(player))
+    set_rule(world.get_entrance('PoD Arena Landing Bonk Path', player), create_helper_rule('has_Boots', player))
     set_rule(world.get_entrance('PoD Mimics 1 NW', player), lambda state: state.can_shoot_arrows(player))
     set_rule(world.get_entrance('PoD Mimics 2 NW', player), lambda state: state.can_shoot_arrows(player))
     set_rule(world.get_entrance('PoD Bow Statue Down Ladder', player), lambda state: state.can_shoot_arrows(player))
@@ -265,7 +270,7 @@ def global_rules(world, player):
 
     set_rule(world.get_entrance('Skull Big Chest Hookpath', player), lambda state: state.has('Hookshot', player))
     set_rule(world.get_entrance('Skull Torch Room WN', player), lambda state: state.has('Fire Rod', player))
-    set_rule(world.get_entrance('Skull Vines NW', player), lambda state: state.has_sword(player))
+    set_rule(world.get_entrance('Skull Vines NW', player), create_helper_rule('has_sword', player))
     set_defeat_dungeon_boss_rule(world.get_location('Skull Woods - Boss', player))
     set_defeat_dungeon_boss_rule(world.get_location('Skull Woods - Prize', player))
 
@@ -273,7 +278,7 @@ def global_rules(world, player):
 
     set_rule(world.get_location('Thieves\' Town - Big Chest', player), lambda state: state.has('Hammer', player))
     for entrance in ['Thieves Basement Block Path', 'Thieves Blocked Entry Path', 'Thieves Conveyor Block Path', 'Thieves Conveyor Bridge Block Path']:
-        set_rule(world.get_entrance(entrance, player), lambda state: state.can_lift_rocks(player))
+        set_rule(world.get_entrance(entrance, player), create_helper_rule('can_lift_rocks', player))
 
     # I think these rules are unnecessary now - testing needed
     # for location in ['Thieves\' Town - Blind\'s Cell', 'Thieves\' Town - Boss']:
@@ -285,7 +290,7 @@ def global_rules(world, player):
     set_rule(world.get_location('Thieves\' Town - Boss', player), lambda state: state.has('Maiden Unmasked', player) and world.get_location('Thieves\' Town - Boss', player).parent_region.dungeon.boss.can_defeat(state))
     set_rule(world.get_location('Thieves\' Town - Prize', player), lambda state: state.has('Maiden Unmasked', player) and world.get_location('Thieves\' Town - Prize', player).parent_region.dungeon.boss.can_defeat(state))
 
-    set_rule(world.get_entrance('Ice Lobby WS', player), lambda state: state.can_melt_things(player))
+    set_rule(world.get_entrance('Ice Lobby WS', player), create_helper_rule('can_melt_things', player))
     set_rule(world.get_entrance('Ice Hammer Block ES', player), lambda state: state.can_lift_rocks(player) and state.has('Hammer', player))
     set_rule(world.get_location('Ice Palace - Hammer Block Key Drop', player), lambda state: state.can_lift_rocks(player) and state.has('Hammer', player))
     set_rule(world.get_location('Ice Palace - Map Chest', player), lambda state: state.can_lift_rocks(player) and state.has('Hammer', player))
@@ -295,7 +300,7 @@ def global_rules(world, player):
     set_rule(world.get_entrance('Ice Spike Room Up Stairs', player), lambda state: state.world.can_take_damage or state.has('Hookshot', player) or state.has('Cape', player) or state.has('Cane of Byrna', player))
     set_rule(world.get_entrance('Ice Spike Room Down Stairs', player), lambda state: state.world.can_take_damage or state.has('Hookshot', player) or state.has('Cape', player) or state.has('Cane of Byrna', player))
     set_rule(world.get_location('Ice Palace - Spike Room', player), lambda state: state.world.can_take_damage or state.has('Hookshot', player) or state.has('Cape', player) or state.has('Cane of Byrna', player))
-    set_rule(world.get_location('Ice Palace - Freezor Chest', player), lambda state: state.can_melt_things(player))
+    set_rule(world.get_location('Ice Palace - Freezor Chest', player), create_helper_rule('can_melt_things', player))
     set_rule(world.get_entrance('Ice Hookshot Ledge Path', player), lambda state: state.has('Hookshot', player))
     set_rule(world.get_entrance('Ice Hookshot Balcony Path', player), lambda state: state.has('Hookshot', player))
     if not world.get_door('Ice Switch Room SE', player).entranceFlag:
@@ -313,8 +318,8 @@ def global_rules(world, player):
             # byrna could work with sufficient magic
     set_rule(world.get_location('Misery Mire - Spike Chest', player), lambda state: (state.world.can_take_damage and state.has_hearts(player, 4)) or state.has('Cane of Byrna', player) or state.has('Cape', player))
     set_rule(world.get_entrance('Mire Left Bridge Hook Path', player), lambda state: state.has('Hookshot', player))
-    set_rule(world.get_entrance('Mire Tile Room NW', player), lambda state: state.has_fire_source(player))
-    set_rule(world.get_entrance('Mire Attic Hint Hole', player), lambda state: state.has_fire_source(player))
+    set_rule(world.get_entrance('Mire Tile Room NW', player), create_helper_rule('has_fire_source', player))
+    set_rule(world.get_entrance('Mire Attic Hint Hole', player), create_helper_rule('has_fire_source', player))
     set_rule(world.get_entrance('Mire Dark Shooters SW', player), lambda state: state.has('Cane of Somaria', player))
 
     set_defeat_dungeon_boss_rule(world.get_location('Misery Mire - Boss', player))
@@ -342,7 +347,7 @@ def global_rules(world, player):
     set_defeat_dungeon_boss_rule(world.get_location('Turtle Rock - Boss', player))
     set_defeat_dungeon_boss_rule(world.get_location('Turtle Rock - Prize', player))
 
-    set_rule(world.get_location('Ganons Tower - Bob\'s Torch', player), lambda state: state.has_Boots(player))
+    set_rule(world.get_location('Ganons Tower - Bob\'s Torch', player), create_helper_rule('has_Boots', player))
     set_rule(world.get_entrance('GT Hope Room EN', player), lambda state: state.has('Cane of Somaria', player))
     set_rule(world.get_entrance('GT Conveyor Cross WN', player), lambda state: state.has('Hammer', player))
     set_rule(world.get_entrance('GT Conveyor Cross EN', player), lambda state: state.has('Hookshot', player))
@@ -380,8 +385,8 @@ def global_rules(world, player):
     set_rule(world.get_entrance('GT Wizzrobes 2 NE', player), lambda state: state.can_kill_most_things(player))
     set_rule(world.get_entrance('GT Lanmolas 2 ES', player), lambda state: world.get_region('GT Lanmolas 2', player).dungeon.bosses['middle'].can_defeat(state))
     set_rule(world.get_entrance('GT Lanmolas 2 NW', player), lambda state: world.get_region('GT Lanmolas 2', player).dungeon.bosses['middle'].can_defeat(state))
-    set_rule(world.get_entrance('GT Torch Cross ES', player), lambda state: state.has_fire_source(player))
-    set_rule(world.get_entrance('GT Falling Torches NE', player), lambda state: state.has_fire_source(player))
+    set_rule(world.get_entrance('GT Torch Cross ES', player), create_helper_rule('has_fire_source', player))
+    set_rule(world.get_entrance('GT Falling Torches NE', player), create_helper_rule('has_fire_source', player))
     set_rule(world.get_entrance('GT Moldorm Gap', player), lambda state: state.has('Hookshot', player) and world.get_region('GT Moldorm', player).dungeon.bosses['top'].can_defeat(state))
     set_defeat_dungeon_boss_rule(world.get_location('Agahnim 2', player))
 
@@ -441,7 +446,7 @@ def global_rules(world, player):
     set_rule(world.get_entrance('PoD Dark Pegs Middle to Ranged Crystal', player), lambda state: state.can_shoot_arrows(player) or state.can_use_bombs(player) or state.has('Red Boomerang', player) or state.has('Fire Rod', player) or state.has('Ice Rod', player) or state.has('Cane of Somaria', player) or (state.has('Hookshot', player) and state.can_reach_orange(world.get_region('PoD Dark Pegs Middle', player), player))) # or state.has_beam_sword(player)
     set_rule(world.get_entrance('PoD Dark Pegs Left to Ranged Crystal', player), lambda state: state.can_shoot_arrows(player) or state.has('Red Boomerang', player) or state.has('Fire Rod', player) or state.has('Ice Rod', player) or state.has('Cane of Somaria', player)) # or state.has_beam_sword(player)
     set_rule(world.get_entrance('PoD Dark Pegs Right to Middle Bypass', player), lambda state: state.has('Blue Boomerang', player))
-    set_rule(world.get_entrance('PoD Dark Pegs Middle to Left Bypass', player), lambda state: state.can_use_bombs(player))
+    set_rule(world.get_entrance('PoD Dark Pegs Middle to Left Bypass', player), create_helper_rule('can_use_bombs', player))
 
     set_rule(world.get_entrance('Swamp Crystal Switch Outer to Inner Barrier - Blue', player), lambda state: state.can_reach_blue(world.get_region('Swamp Trench 2 Pots', player), player))
     set_rule(world.get_entrance('Swamp Crystal Switch Inner to Outer Barrier - Blue', player), lambda state: state.can_reach_blue(world.get_region('Swamp Trench 2 Pots', player), player))
@@ -562,7 +567,7 @@ def global_rules(world, player):
     add_rule(world.get_location('Sunken Treasure', player), lambda state: state.has('Open Floodgate', player))
     set_rule(world.get_location('Ganon', player), lambda state: state.has_beam_sword(player) and state.has_fire_source(player) and state.has_crystals(world.crystals_needed_for_ganon[player], player)
                                                                 and (state.has('Tempered Sword', player) or state.has('Golden Sword', player) or (state.has('Silver Arrows', player) and state.can_shoot_arrows(player)) or state.has('Lamp', player) or state.can_extend_magic(player, 12)))  # need to light torch a sufficient amount of times
-    set_rule(world.get_entrance('Ganon Drop', player), lambda state: state.has_beam_sword(player))  # need to damage ganon to get tiles to drop
+    set_rule(world.get_entrance('Ganon Drop', player), create_helper_rule('has_beam_sword', player))  # need to damage ganon to get tiles to drop
 
 def bomb_rules(world, player):
     bonkable_doors = ['Two Brothers House Exit (West)', 'Two Brothers House Exit (East)'] # Technically this is incorrectly defined, but functionally the same as what is intended.
@@ -572,7 +577,7 @@ def bomb_rules(world, player):
     for entrance in bonkable_doors:
         add_rule(world.get_entrance(entrance, player), lambda state: state.can_use_bombs(player) or state.has_Boots(player)) 
     for entrance in bombable_doors:
-        add_rule(world.get_entrance(entrance, player), lambda state: state.can_use_bombs(player)) 
+        add_rule(world.get_entrance(entrance, player), create_helper_rule('can_use_bombs', player)) 
 
     bonkable_items = ['Sahasrahla\'s Hut - Left', 'Sahasrahla\'s Hut - Middle', 'Sahasrahla\'s Hut - Right']
     bombable_items = ['Blind\'s Hideout - Top', 'Kakariko Well - Top', 'Chicken House', 'Aginah\'s Cave', 'Graveyard Cave',
@@ -581,7 +586,7 @@ def bomb_rules(world, player):
     for location in bonkable_items:
         add_rule(world.get_location(location, player), lambda state: state.can_use_bombs(player) or state.has_Boots(player)) 
     for location in bombable_items:
-        add_rule(world.get_location(location, player), lambda state: state.can_use_bombs(player)) 
+        add_rule(world.get_location(location, player), create_helper_rule('can_use_bombs', player)) 
 
     cave_kill_locations = ['Mini Moldorm Cave - Far Left', 'Mini Moldorm Cave - Far Right', 'Mini Moldorm Cave - Left', 'Mini Moldorm Cave - Right', 'Mini Moldorm Cave - Generous Guy', 'Spiral Cave']
     for location in cave_kill_locations:
@@ -613,7 +618,7 @@ def bomb_rules(world, player):
             add_rule(world.get_entrance(killdoor, player), lambda state: (state.can_use_bombs(player) or state.can_kill_most_things(player)))
         else:
             add_rule(world.get_entrance(killdoor, player), lambda state: state.can_kill_most_things(player))
-    add_rule(world.get_entrance('Ice Stalfos Hint SE', player), lambda state: state.can_use_bombs(player)) # Need bombs for big stalfos knights
+    add_rule(world.get_entrance('Ice Stalfos Hint SE', player), create_helper_rule('can_use_bombs', player)) # Need bombs for big stalfos knights
     add_rule(world.get_entrance('Mire Cross ES', player), lambda state: state.can_kill_most_things(player)) # 4 Sluggulas. Bombs don't work // or (state.can_use_bombs(player) and state.has('Magic Powder'), player) 
 
     enemy_kill_drops = [ # Location, bool-bombable
@@ -640,14 +645,14 @@ def bomb_rules(world, player):
         else:
             add_rule(world.get_location(location, player), lambda state: state.can_kill_most_things(player))
 
-    add_rule(world.get_location('Attic Cracked Floor', player), lambda state: state.can_use_bombs(player)) 
+    add_rule(world.get_location('Attic Cracked Floor', player), create_helper_rule('can_use_bombs', player)) 
     bombable_floors = ['PoD Pit Room Bomb Hole', 'Ice Bomb Drop Hole', 'Ice Freezors Bomb Hole', 'GT Bob\'s Room Hole']
     for entrance in bombable_floors:
-        add_rule(world.get_entrance(entrance, player), lambda state: state.can_use_bombs(player)) 
+        add_rule(world.get_entrance(entrance, player), create_helper_rule('can_use_bombs', player)) 
 
     if world.doorShuffle[player] == 'vanilla':
-        add_rule(world.get_entrance('TR Lazy Eyes SE', player), lambda state: state.can_use_bombs(player)) # ToDo: Add always true for inverted, cross-entrance, and door-variants and so on.
-        add_rule(world.get_entrance('Turtle Rock Ledge Exit (West)', player), lambda state: state.can_use_bombs(player)) # Is this the same as above?
+        add_rule(world.get_entrance('TR Lazy Eyes SE', player), create_helper_rule('can_use_bombs', player)) # ToDo: Add always true for inverted, cross-entrance, and door-variants and so on.
+        add_rule(world.get_entrance('Turtle Rock Ledge Exit (West)', player), create_helper_rule('can_use_bombs', player)) # Is this the same as above?
 
         dungeon_bonkable = ['Sewers Rat Path WS', 'Sewers Rat Path WN',
                             'PoD Warp Hint SE', 'PoD Jelly Hall NW', 'PoD Jelly Hall NE', 'PoD Mimics 1 SW',
@@ -666,34 +671,34 @@ def bomb_rules(world, player):
         for entrance in dungeon_bonkable:
             add_rule(world.get_entrance(entrance, player), lambda state: state.can_use_bombs(player) or state.has_Boots(player)) 
         for entrance in dungeon_bombable:
-            add_rule(world.get_entrance(entrance, player), lambda state: state.can_use_bombs(player)) 
+            add_rule(world.get_entrance(entrance, player), create_helper_rule('can_use_bombs', player)) 
     else:
         doors_to_bomb_check = [x for x in world.doors if x.player == player and x.type in [DoorType.Normal, DoorType.Interior]]
         for door in doors_to_bomb_check:
             if door.kind(world) in [DoorKind.Dashable]:
                 add_rule(door.entrance, lambda state: state.can_use_bombs(player) or state.has_Boots(player))
             elif door.kind(world) in [DoorKind.Bombable]:
-                add_rule(door.entrance, lambda state: state.can_use_bombs(player))
+                add_rule(door.entrance, create_helper_rule('can_use_bombs', player))
 
 def default_rules(world, player):
     # overworld requirements
-    set_rule(world.get_entrance('Kings Grave', player), lambda state: state.has_Boots(player))
-    set_rule(world.get_entrance('Kings Grave Outer Rocks', player), lambda state: state.can_lift_heavy_rocks(player))
-    set_rule(world.get_entrance('Kings Grave Inner Rocks', player), lambda state: state.can_lift_heavy_rocks(player))
+    set_rule(world.get_entrance('Kings Grave', player), create_helper_rule('has_Boots', player))
+    set_rule(world.get_entrance('Kings Grave Outer Rocks', player), create_helper_rule('can_lift_heavy_rocks', player))
+    set_rule(world.get_entrance('Kings Grave Inner Rocks', player), create_helper_rule('can_lift_heavy_rocks', player))
     set_rule(world.get_entrance('Kings Grave Mirror Spot', player), lambda state: state.has_Pearl(player) and state.has_Mirror(player))
     # Caution: If king's grave is releaxed at all to account for reaching it via a two way cave's exit in insanity mode, then the bomb shop logic will need to be updated (that would involve create a small ledge-like Region for it)
-    set_rule(world.get_entrance('Bonk Fairy (Light)', player), lambda state: state.has_Boots(player))
+    set_rule(world.get_entrance('Bonk Fairy (Light)', player), create_helper_rule('has_Boots', player))
     set_rule(world.get_entrance('Bat Cave Drop Ledge', player), lambda state: state.has('Hammer', player))
     set_rule(world.get_entrance('Lumberjack Tree Tree', player), lambda state: state.has_Boots(player) and state.has('Beat Agahnim 1', player))
-    set_rule(world.get_entrance('Bonk Rock Cave', player), lambda state: state.has_Boots(player))
+    set_rule(world.get_entrance('Bonk Rock Cave', player), create_helper_rule('has_Boots', player))
     set_rule(world.get_entrance('Desert Palace Stairs', player), lambda state: state.has('Book of Mudora', player))
-    set_rule(world.get_entrance('Sanctuary Grave', player), lambda state: state.can_lift_rocks(player))
-    set_rule(world.get_entrance('20 Rupee Cave', player), lambda state: state.can_lift_rocks(player))
-    set_rule(world.get_entrance('50 Rupee Cave', player), lambda state: state.can_lift_rocks(player))
-    set_rule(world.get_entrance('Death Mountain Entrance Rock', player), lambda state: state.can_lift_rocks(player))
-    set_rule(world.get_entrance('Bumper Cave Entrance Mirror Spot', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('Sanctuary Grave', player), create_helper_rule('can_lift_rocks', player))
+    set_rule(world.get_entrance('20 Rupee Cave', player), create_helper_rule('can_lift_rocks', player))
+    set_rule(world.get_entrance('50 Rupee Cave', player), create_helper_rule('can_lift_rocks', player))
+    set_rule(world.get_entrance('Death Mountain Entrance Rock', player), create_helper_rule('can_lift_rocks', player))
+    set_rule(world.get_entrance('Bumper Cave Entrance Mirror Spot', player), create_helper_rule('has_Mirror', player))
     set_rule(world.get_entrance('Flute Spot 1', player), lambda state: state.has('Ocarina', player))
-    set_rule(world.get_entrance('Lake Hylia Central Island Teleporter', player), lambda state: state.can_lift_heavy_rocks(player))
+    set_rule(world.get_entrance('Lake Hylia Central Island Teleporter', player), create_helper_rule('can_lift_heavy_rocks', player))
     set_rule(world.get_entrance('Dark Desert Teleporter', player), lambda state: state.has('Ocarina', player) and state.can_lift_heavy_rocks(player))
     set_rule(world.get_entrance('East Hyrule Teleporter', player), lambda state: state.has('Hammer', player) and state.can_lift_rocks(player) and state.has_Pearl(player)) # bunny cannot use hammer
     set_rule(world.get_entrance('South Hyrule Teleporter', player), lambda state: state.has('Hammer', player) and state.can_lift_rocks(player) and state.has_Pearl(player)) # bunny cannot use hammer
@@ -702,57 +707,57 @@ def default_rules(world, player):
 
     set_rule(world.get_location('Zora\'s Ledge', player), lambda state: state.has('Flippers', player))
     set_rule(world.get_entrance('Waterfall of Wishing', player), lambda state: state.has('Flippers', player))  # can be fake flippered into, but is in weird state inside that might prevent you from doing things. Can be improved in future Todo
-    set_rule(world.get_location('Frog', player), lambda state: state.can_lift_heavy_rocks(player)) # will get automatic moon pearl requirement
+    set_rule(world.get_location('Frog', player), create_helper_rule('can_lift_heavy_rocks', player)) # will get automatic moon pearl requirement
     set_rule(world.get_location('Potion Shop', player), lambda state: state.has('Mushroom', player))
-    set_rule(world.get_entrance('Desert Palace Entrance (North) Rocks', player), lambda state: state.can_lift_rocks(player))
-    set_rule(world.get_entrance('Desert Ledge Return Rocks', player), lambda state: state.can_lift_rocks(player))  # should we decide to place something that is not a dungeon end up there at some point
-    set_rule(world.get_entrance('Checkerboard Cave', player), lambda state: state.can_lift_rocks(player))
+    set_rule(world.get_entrance('Desert Palace Entrance (North) Rocks', player), create_helper_rule('can_lift_rocks', player))
+    set_rule(world.get_entrance('Desert Ledge Return Rocks', player), create_helper_rule('can_lift_rocks', player))  # should we decide to place something that is not a dungeon end up there at some point
+    set_rule(world.get_entrance('Checkerboard Cave', player), create_helper_rule('can_lift_rocks', player))
     set_rule(world.get_entrance('Agahnims Tower', player), lambda state: state.has('Cape', player) or state.has_beam_sword(player) or state.has('Beat Agahnim 1', player))  # barrier gets removed after killing agahnim, relevant for entrance shuffle
     set_rule(world.get_entrance('Top of Pyramid', player), lambda state: state.has('Beat Agahnim 1', player))
     set_rule(world.get_entrance('Old Man Cave Exit (West)', player), lambda state: False)  # drop cannot be climbed up
     set_rule(world.get_entrance('Broken Bridge (West)', player), lambda state: state.has('Hookshot', player))
     set_rule(world.get_entrance('Broken Bridge (East)', player), lambda state: state.has('Hookshot', player))
-    set_rule(world.get_entrance('East Death Mountain Teleporter', player), lambda state: state.can_lift_heavy_rocks(player))
-    set_rule(world.get_entrance('Fairy Ascension Rocks', player), lambda state: state.can_lift_heavy_rocks(player))
+    set_rule(world.get_entrance('East Death Mountain Teleporter', player), create_helper_rule('can_lift_heavy_rocks', player))
+    set_rule(world.get_entrance('Fairy Ascension Rocks', player), create_helper_rule('can_lift_heavy_rocks', player))
     # can erase block - overridden in noglitches
-    set_rule(world.get_entrance('Paradox Cave Push Block Reverse', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('Paradox Cave Push Block Reverse', player), create_helper_rule('has_Mirror', player))
     set_rule(world.get_entrance('Death Mountain (Top)', player), lambda state: state.has('Hammer', player))
     set_rule(world.get_entrance('Turtle Rock Teleporter', player), lambda state: state.can_lift_heavy_rocks(player) and state.has('Hammer', player))
     set_rule(world.get_entrance('East Death Mountain (Top)', player), lambda state: state.has('Hammer', player))
 
-    set_rule(world.get_entrance('Catfish Exit Rock', player), lambda state: state.can_lift_rocks(player))
-    set_rule(world.get_entrance('Catfish Entrance Rock', player), lambda state: state.can_lift_rocks(player))
+    set_rule(world.get_entrance('Catfish Exit Rock', player), create_helper_rule('can_lift_rocks', player))
+    set_rule(world.get_entrance('Catfish Entrance Rock', player), create_helper_rule('can_lift_rocks', player))
     set_rule(world.get_entrance('Northeast Dark World Broken Bridge Pass', player), lambda state: state.has_Pearl(player) and (state.can_lift_rocks(player) or state.has('Hammer', player) or state.has('Flippers', player)))
     set_rule(world.get_entrance('East Dark World Broken Bridge Pass', player), lambda state: state.has_Pearl(player) and (state.can_lift_rocks(player) or state.has('Hammer', player)))
     set_rule(world.get_entrance('South Dark World Bridge', player), lambda state: state.has('Hammer', player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Bonk Fairy (Dark)', player), lambda state: state.has_Pearl(player) and state.has_Boots(player))
     set_rule(world.get_entrance('West Dark World Gap', player), lambda state: state.has_Pearl(player) and state.has('Hookshot', player))
-    set_rule(world.get_entrance('Palace of Darkness', player), lambda state: state.has_Pearl(player)) # kiki needs pearl
-    set_rule(world.get_entrance('Hyrule Castle Ledge Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Hyrule Castle Main Gate', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('Palace of Darkness', player), create_helper_rule('has_Pearl', player)) # kiki needs pearl
+    set_rule(world.get_entrance('Hyrule Castle Ledge Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Hyrule Castle Main Gate', player), create_helper_rule('has_Mirror', player))
     set_rule(world.get_entrance('Dark Lake Hylia Drop (East)', player), lambda state: (state.has_Pearl(player) and state.has('Flippers', player) or state.has_Mirror(player)))  # Overworld Bunny Revival
     set_rule(world.get_location('Bombos Tablet', player), lambda state: state.has('Book of Mudora', player) and state.has_beam_sword(player))
     set_rule(world.get_entrance('Dark Lake Hylia Drop (South)', player), lambda state: state.has_Pearl(player) and state.has('Flippers', player))  # ToDo any fake flipper set up?
-    set_rule(world.get_entrance('Dark Lake Hylia Ledge Fairy', player), lambda state: state.has_Pearl(player)) # bomb required
+    set_rule(world.get_entrance('Dark Lake Hylia Ledge Fairy', player), create_helper_rule('has_Pearl', player)) # bomb required
     set_rule(world.get_entrance('Dark Lake Hylia Ledge Spike Cave', player), lambda state: state.can_lift_rocks(player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Dark Lake Hylia Teleporter', player), lambda state: state.has_Pearl(player) and (state.has('Hammer', player) or state.can_lift_rocks(player)))  # Fake Flippers
     set_rule(world.get_entrance('Village of Outcasts Heavy Rock', player), lambda state: state.has_Pearl(player) and state.can_lift_heavy_rocks(player))
-    set_rule(world.get_entrance('Hype Cave', player), lambda state: state.has_Pearl(player)) # bomb required
-    set_rule(world.get_entrance('Brewery', player), lambda state: state.has_Pearl(player)) # bomb required
-    set_rule(world.get_entrance('Thieves Town', player), lambda state: state.has_Pearl(player)) # bunny cannot pull
-    set_rule(world.get_entrance('Skull Woods First Section Hole (North)', player), lambda state: state.has_Pearl(player)) # bunny cannot lift bush
-    set_rule(world.get_entrance('Skull Woods Second Section Hole', player), lambda state: state.has_Pearl(player)) # bunny cannot lift bush
-    set_rule(world.get_entrance('Maze Race Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Cave 45 Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Bombos Tablet Mirror Spot', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('Hype Cave', player), create_helper_rule('has_Pearl', player)) # bomb required
+    set_rule(world.get_entrance('Brewery', player), create_helper_rule('has_Pearl', player)) # bomb required
+    set_rule(world.get_entrance('Thieves Town', player), create_helper_rule('has_Pearl', player)) # bunny cannot pull
+    set_rule(world.get_entrance('Skull Woods First Section Hole (North)', player), create_helper_rule('has_Pearl', player)) # bunny cannot lift bush
+    set_rule(world.get_entrance('Skull Woods Second Section Hole', player), create_helper_rule('has_Pearl', player)) # bunny cannot lift bush
+    set_rule(world.get_entrance('Maze Race Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Cave 45 Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Bombos Tablet Mirror Spot', player), create_helper_rule('has_Mirror', player))
     set_rule(world.get_entrance('East Dark World Bridge', player), lambda state: state.has_Pearl(player) and state.has('Hammer', player))
     set_rule(world.get_entrance('Lake Hylia Island Mirror Spot', player), lambda state: state.has_Pearl(player) and state.has_Mirror(player) and state.has('Flippers', player))
-    set_rule(world.get_entrance('Lake Hylia Central Island Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('East Dark World River Pier', player), lambda state: state.has_Pearl(player))
+    set_rule(world.get_entrance('Lake Hylia Central Island Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('East Dark World River Pier', player), create_helper_rule('has_Pearl', player))
     set_rule(world.get_entrance('Graveyard Ledge Mirror Spot', player), lambda state: state.has_Pearl(player) and state.has_Mirror(player))
     set_rule(world.get_entrance('Bumper Cave Entrance Rock', player), lambda state: state.has_Pearl(player) and state.can_lift_rocks(player))
-    set_rule(world.get_entrance('Bumper Cave Ledge Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Bat Cave Drop Ledge Mirror Spot', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('Bumper Cave Ledge Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Bat Cave Drop Ledge Mirror Spot', player), create_helper_rule('has_Mirror', player))
     set_rule(world.get_entrance('Dark World Hammer Peg Cave', player), lambda state: state.has_Pearl(player) and state.has('Hammer', player))
     set_rule(world.get_entrance('Village of Outcasts Eastern Rocks', player), lambda state: state.has_Pearl(player) and state.can_lift_heavy_rocks(player))
     set_rule(world.get_entrance('Peg Area Rocks', player), lambda state: state.has_Pearl(player) and state.can_lift_heavy_rocks(player))
@@ -763,20 +768,20 @@ def default_rules(world, player):
 
     set_rule(world.get_entrance('Skull Woods Final Section', player), lambda state: state.has('Fire Rod', player) and state.has_Pearl(player)) # bunny cannot use fire rod
     set_rule(world.get_entrance('Misery Mire', player), lambda state: state.has_Pearl(player) and state.has_sword(player) and state.has_misery_mire_medallion(player))  # sword required to cast magic (!)
-    set_rule(world.get_entrance('Desert Ledge (Northeast) Mirror Spot', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('Desert Ledge (Northeast) Mirror Spot', player), create_helper_rule('has_Mirror', player))
 
-    set_rule(world.get_entrance('Desert Ledge Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Desert Palace Stairs Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Desert Palace Entrance (North) Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Spectacle Rock Mirror Spot', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('Desert Ledge Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Desert Palace Stairs Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Desert Palace Entrance (North) Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Spectacle Rock Mirror Spot', player), create_helper_rule('has_Mirror', player))
     set_rule(world.get_entrance('Hookshot Cave', player), lambda state: state.can_lift_rocks(player) and state.has_Pearl(player))
 
-    set_rule(world.get_entrance('East Death Mountain (Top) Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Mimic Cave Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Spiral Cave Mirror Spot', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('East Death Mountain (Top) Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Mimic Cave Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Spiral Cave Mirror Spot', player), create_helper_rule('has_Mirror', player))
     set_rule(world.get_entrance('Fairy Ascension Mirror Spot', player), lambda state: state.has_Mirror(player) and state.has_Pearl(player))  # need to lift flowers
-    set_rule(world.get_entrance('Isolated Ledge Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Floating Island Mirror Spot', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('Isolated Ledge Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Floating Island Mirror Spot', player), create_helper_rule('has_Mirror', player))
     set_rule(world.get_entrance('Turtle Rock', player), lambda state: state.has_Pearl(player) and state.has_sword(player) and state.has_turtle_rock_medallion(player) and state.can_reach('Turtle Rock (Top)', 'Region', player))  # sword required to cast magic (!)
 
     set_rule(world.get_entrance('Pyramid Hole', player), lambda state: state.has('Beat Agahnim 2', player) or world.open_pyramid[player])
@@ -791,24 +796,24 @@ def inverted_rules(world, player):
     set_rule(world.get_entrance('Castle Ledge S&Q', player), lambda state: state.has_Mirror(player) and state.has('Beat Agahnim 1', player))
 
     # overworld requirements 
-    set_rule(world.get_location('Ice Rod Cave', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_location('Maze Race', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Mini Moldorm Cave', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Ice Rod Cave', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Light Hype Fairy', player), lambda state: state.has_Pearl(player))
+    set_rule(world.get_location('Ice Rod Cave', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_location('Maze Race', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Mini Moldorm Cave', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Ice Rod Cave', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Light Hype Fairy', player), create_helper_rule('has_Pearl', player))
     set_rule(world.get_entrance('Potion Shop Pier', player), lambda state: state.has('Flippers', player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Light World Pier', player), lambda state: state.has('Flippers', player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Kings Grave', player), lambda state: state.has_Boots(player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Kings Grave Outer Rocks', player), lambda state: state.can_lift_heavy_rocks(player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Kings Grave Inner Rocks', player), lambda state: state.can_lift_heavy_rocks(player) and state.has_Pearl(player))
-    set_rule(world.get_entrance('Potion Shop Inner Bushes', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Potion Shop Outer Bushes', player), lambda state: state.has_Pearl(player))
+    set_rule(world.get_entrance('Potion Shop Inner Bushes', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Potion Shop Outer Bushes', player), create_helper_rule('has_Pearl', player))
     set_rule(world.get_entrance('Potion Shop Outer Rock', player), lambda state: state.can_lift_rocks(player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Potion Shop Inner Rock', player), lambda state: state.can_lift_rocks(player) and state.has_Pearl(player))
-    set_rule(world.get_entrance('Graveyard Cave Inner Bushes', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Graveyard Cave Outer Bushes', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Secret Passage Inner Bushes', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Secret Passage Outer Bushes', player), lambda state: state.has_Pearl(player))
+    set_rule(world.get_entrance('Graveyard Cave Inner Bushes', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Graveyard Cave Outer Bushes', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Secret Passage Inner Bushes', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Secret Passage Outer Bushes', player), create_helper_rule('has_Pearl', player))
     set_rule(world.get_entrance('Bonk Fairy (Light)', player), lambda state: state.has_Boots(player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Bat Cave Drop Ledge', player), lambda state: state.has('Hammer', player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Lumberjack Tree Tree', player), lambda state: state.has_Boots(player) and state.has_Pearl(player) and state.has('Beat Agahnim 1', player))
@@ -818,9 +823,9 @@ def inverted_rules(world, player):
     set_rule(world.get_entrance('20 Rupee Cave', player), lambda state: state.can_lift_rocks(player) and state.has_Pearl(player))
     set_rule(world.get_entrance('50 Rupee Cave', player), lambda state: state.can_lift_rocks(player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Death Mountain Entrance Rock', player), lambda state: state.can_lift_rocks(player) and state.has_Pearl(player))
-    set_rule(world.get_entrance('Bumper Cave Entrance Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Lake Hylia Central Island Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Dark Lake Hylia Central Island Teleporter', player), lambda state: state.can_lift_heavy_rocks(player))
+    set_rule(world.get_entrance('Bumper Cave Entrance Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Lake Hylia Central Island Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Dark Lake Hylia Central Island Teleporter', player), create_helper_rule('can_lift_heavy_rocks', player))
     set_rule(world.get_entrance('Dark Desert Teleporter', player), lambda state: state.can_flute(player) and state.can_lift_heavy_rocks(player))
     set_rule(world.get_entrance('East Dark World Teleporter', player), lambda state: state.has('Hammer', player) and state.can_lift_rocks(player) and state.has_Pearl(player)) # bunny cannot use hammer
     set_rule(world.get_entrance('South Dark World Teleporter', player), lambda state: state.has('Hammer', player) and state.can_lift_rocks(player) and state.has_Pearl(player)) # bunny cannot use hammer
@@ -833,53 +838,53 @@ def inverted_rules(world, player):
     set_rule(world.get_location('Frog', player), lambda state: state.can_lift_heavy_rocks(player) and
                                                                (state.has_Pearl(player) or state.has('Beat Agahnim 1', player)) or (state.can_reach('Light World', 'Region', player)
                                                                                                                                     and state.has_Mirror(player)))  # Need LW access using Mirror or Portal
-    set_rule(world.get_location('Mushroom', player), lambda state: state.has_Pearl(player)) # need pearl to pick up bushes
-    set_rule(world.get_entrance('Bush Covered Lawn Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Bush Covered Lawn Inner Bushes', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Bush Covered Lawn Outer Bushes', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Bomb Hut Inner Bushes', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Bomb Hut Outer Bushes', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Light World Bomb Hut', player), lambda state: state.has_Pearl(player)) # need bomb
-    set_rule(world.get_entrance('North Fairy Cave Drop', player), lambda state: state.has_Pearl(player))
-    set_rule(world.get_entrance('Lost Woods Hideout Drop', player), lambda state: state.has_Pearl(player))
+    set_rule(world.get_location('Mushroom', player), create_helper_rule('has_Pearl', player)) # need pearl to pick up bushes
+    set_rule(world.get_entrance('Bush Covered Lawn Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Bush Covered Lawn Inner Bushes', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Bush Covered Lawn Outer Bushes', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Bomb Hut Inner Bushes', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Bomb Hut Outer Bushes', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Light World Bomb Hut', player), create_helper_rule('has_Pearl', player)) # need bomb
+    set_rule(world.get_entrance('North Fairy Cave Drop', player), create_helper_rule('has_Pearl', player))
+    set_rule(world.get_entrance('Lost Woods Hideout Drop', player), create_helper_rule('has_Pearl', player))
     set_rule(world.get_location('Potion Shop', player), lambda state: state.has('Mushroom', player) and (state.can_reach('Potion Shop Area', 'Region', player)))  # new inverted region, need pearl for bushes or access to potion shop door/waterfall fairy
     set_rule(world.get_entrance('Desert Palace Entrance (North) Rocks', player), lambda state: state.can_lift_rocks(player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Desert Ledge Return Rocks', player), lambda state: state.can_lift_rocks(player) and state.has_Pearl(player))  # should we decide to place something that is not a dungeon end up there at some point
     set_rule(world.get_entrance('Checkerboard Cave', player), lambda state: state.can_lift_rocks(player) and state.has_Pearl(player))
-    set_rule(world.get_entrance('Hyrule Castle Secret Entrance Drop', player), lambda state: state.has_Pearl(player))
+    set_rule(world.get_entrance('Hyrule Castle Secret Entrance Drop', player), create_helper_rule('has_Pearl', player))
     set_rule(world.get_entrance('Old Man Cave Exit (West)', player), lambda state: False)  # drop cannot be climbed up
     set_rule(world.get_entrance('Broken Bridge (West)', player), lambda state: state.has('Hookshot', player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Broken Bridge (East)', player), lambda state: state.has('Hookshot', player) and state.has_Pearl(player))
-    set_rule(world.get_entrance('Dark Death Mountain Teleporter (East Bottom)', player), lambda state: state.can_lift_heavy_rocks(player))
+    set_rule(world.get_entrance('Dark Death Mountain Teleporter (East Bottom)', player), create_helper_rule('can_lift_heavy_rocks', player))
     set_rule(world.get_entrance('Fairy Ascension Rocks', player), lambda state: state.can_lift_heavy_rocks(player) and state.has_Pearl(player))
     # can erase block - overridden in noglitches
-    set_rule(world.get_entrance('Paradox Cave Push Block Reverse', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('Paradox Cave Push Block Reverse', player), create_helper_rule('has_Mirror', player))
     set_rule(world.get_entrance('Death Mountain (Top)', player), lambda state: state.has('Hammer', player) and state.has_Pearl(player))
     set_rule(world.get_entrance('Dark Death Mountain Teleporter (East)', player), lambda state: state.can_lift_heavy_rocks(player) and state.has('Hammer', player) and state.has_Pearl(player))  # bunny cannot use hammer
     set_rule(world.get_entrance('East Death Mountain (Top)', player), lambda state: state.has('Hammer', player) and state.has_Pearl(player))  # bunny can not use hammer
 
-    set_rule(world.get_entrance('Catfish Entrance Rock', player), lambda state: state.can_lift_rocks(player))
+    set_rule(world.get_entrance('Catfish Entrance Rock', player), create_helper_rule('can_lift_rocks', player))
     set_rule(world.get_entrance('Northeast Dark World Broken Bridge Pass', player), lambda state: ((state.can_lift_rocks(player) or state.has('Hammer', player)) or state.has('Flippers', player)))
     set_rule(world.get_entrance('East Dark World Broken Bridge Pass', player), lambda state: (state.can_lift_rocks(player) or state.has('Hammer', player)))
     set_rule(world.get_entrance('South Dark World Bridge', player), lambda state: state.has('Hammer', player))
-    set_rule(world.get_entrance('Bonk Fairy (Dark)', player), lambda state: state.has_Boots(player))
+    set_rule(world.get_entrance('Bonk Fairy (Dark)', player), create_helper_rule('has_Boots', player))
     set_rule(world.get_entrance('West Dark World Gap', player), lambda state: state.has('Hookshot', player))
     set_rule(world.get_entrance('Dark Lake Hylia Drop (East)', player), lambda state: state.has('Flippers', player))
     set_rule(world.get_location('Bombos Tablet', player), lambda state: state.has('Book of Mudora', player) and state.has_beam_sword(player))
     set_rule(world.get_entrance('Dark Lake Hylia Drop (South)', player), lambda state: state.has('Flippers', player))  # ToDo any fake flipper set up?
     set_rule(world.get_entrance('Dark Lake Hylia Ledge Pier', player), lambda state: state.has('Flippers', player))
-    set_rule(world.get_entrance('Dark Lake Hylia Ledge Spike Cave', player), lambda state: state.can_lift_rocks(player))
+    set_rule(world.get_entrance('Dark Lake Hylia Ledge Spike Cave', player), create_helper_rule('can_lift_rocks', player))
     set_rule(world.get_entrance('Dark Lake Hylia Teleporter', player), lambda state: state.has('Flippers', player))  # Fake Flippers
     set_rule(world.get_entrance('Dark Lake Hylia Shallows', player), lambda state: state.has('Flippers', player))
-    set_rule(world.get_entrance('Village of Outcasts Heavy Rock', player), lambda state: state.can_lift_heavy_rocks(player))
+    set_rule(world.get_entrance('Village of Outcasts Heavy Rock', player), create_helper_rule('can_lift_heavy_rocks', player))
     set_rule(world.get_entrance('East Dark World Bridge', player), lambda state: state.has('Hammer', player))
-    set_rule(world.get_entrance('Lake Hylia Central Island Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Bumper Cave Entrance Rock', player), lambda state: state.can_lift_rocks(player))
-    set_rule(world.get_entrance('Bumper Cave Ledge Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Hammer Peg Area Mirror Spot', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('Lake Hylia Central Island Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Bumper Cave Entrance Rock', player), create_helper_rule('can_lift_rocks', player))
+    set_rule(world.get_entrance('Bumper Cave Ledge Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Hammer Peg Area Mirror Spot', player), create_helper_rule('has_Mirror', player))
     set_rule(world.get_entrance('Dark World Hammer Peg Cave', player), lambda state: state.has('Hammer', player))
-    set_rule(world.get_entrance('Village of Outcasts Eastern Rocks', player), lambda state: state.can_lift_heavy_rocks(player))
-    set_rule(world.get_entrance('Peg Area Rocks', player), lambda state: state.can_lift_heavy_rocks(player))
+    set_rule(world.get_entrance('Village of Outcasts Eastern Rocks', player), create_helper_rule('can_lift_heavy_rocks', player))
+    set_rule(world.get_entrance('Peg Area Rocks', player), create_helper_rule('can_lift_heavy_rocks', player))
     set_rule(world.get_entrance('Village of Outcasts Pegs', player), lambda state: state.has('Hammer', player))
     set_rule(world.get_entrance('Grassy Lawn Pegs', player), lambda state: state.has('Hammer', player))
     set_rule(world.get_entrance('Bumper Cave Exit (Top)', player), lambda state: state.has('Cape', player))
@@ -888,35 +893,35 @@ def inverted_rules(world, player):
     set_rule(world.get_entrance('Skull Woods Final Section', player), lambda state: state.has('Fire Rod', player))
     set_rule(world.get_entrance('Misery Mire', player), lambda state: state.has_sword(player) and state.has_misery_mire_medallion(player))  # sword required to cast magic (!)
 
-    set_rule(world.get_entrance('Hookshot Cave', player), lambda state: state.can_lift_rocks(player))
+    set_rule(world.get_entrance('Hookshot Cave', player), create_helper_rule('can_lift_rocks', player))
 
-    set_rule(world.get_entrance('East Death Mountain Mirror Spot (Top)', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Death Mountain (Top) Mirror Spot', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('East Death Mountain Mirror Spot (Top)', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Death Mountain (Top) Mirror Spot', player), create_helper_rule('has_Mirror', player))
 
-    set_rule(world.get_entrance('East Death Mountain Mirror Spot (Bottom)', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Dark Death Mountain Ledge Mirror Spot (East)', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Dark Death Mountain Ledge Mirror Spot (West)', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Laser Bridge Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Floating Island Mirror Spot', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('East Death Mountain Mirror Spot (Bottom)', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Dark Death Mountain Ledge Mirror Spot (East)', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Dark Death Mountain Ledge Mirror Spot (West)', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Laser Bridge Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Floating Island Mirror Spot', player), create_helper_rule('has_Mirror', player))
     set_rule(world.get_entrance('Turtle Rock', player), lambda state: state.has_sword(player) and state.has_turtle_rock_medallion(player) and state.can_reach('Turtle Rock (Top)', 'Region', player)) # sword required to cast magic (!)
 
     # new inverted spots
     set_rule(world.get_entrance('Post Aga Teleporter', player), lambda state: state.has('Beat Agahnim 1', player))
-    set_rule(world.get_entrance('Mire Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Desert Palace Stairs Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Death Mountain Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('East Dark World Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('West Dark World Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('South Dark World Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Catfish Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Potion Shop Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Shopping Mall Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Maze Race Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Desert Palace North Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Death Mountain (Top) Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Graveyard Cave Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Bomb Hut Mirror Spot', player), lambda state: state.has_Mirror(player))
-    set_rule(world.get_entrance('Skull Woods Mirror Spot', player), lambda state: state.has_Mirror(player))
+    set_rule(world.get_entrance('Mire Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Desert Palace Stairs Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Death Mountain Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('East Dark World Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('West Dark World Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('South Dark World Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Catfish Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Potion Shop Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Shopping Mall Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Maze Race Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Desert Palace North Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Death Mountain (Top) Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Graveyard Cave Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Bomb Hut Mirror Spot', player), create_helper_rule('has_Mirror', player))
+    set_rule(world.get_entrance('Skull Woods Mirror Spot', player), create_helper_rule('has_Mirror', player))
 
     # inverted flute spots
 
@@ -976,15 +981,15 @@ def fake_flipper_rules(world, player):
         set_rule(world.get_entrance('Lake Hylia Central Island Pier', player), lambda state: True)
         set_rule(world.get_entrance('Hobo Bridge', player), lambda state: True)
         set_rule(world.get_entrance('Dark Lake Hylia Drop (East)', player), lambda state: state.has_Pearl(player) and state.has('Flippers', player))
-        set_rule(world.get_entrance('Dark Lake Hylia Teleporter', player), lambda state: state.has_Pearl(player))
-        set_rule(world.get_entrance('Dark Lake Hylia Ledge Drop', player), lambda state: state.has_Pearl(player))
+        set_rule(world.get_entrance('Dark Lake Hylia Teleporter', player), create_helper_rule('has_Pearl', player))
+        set_rule(world.get_entrance('Dark Lake Hylia Ledge Drop', player), create_helper_rule('has_Pearl', player))
     else:
-        set_rule(world.get_entrance('Zoras River', player), lambda state: state.has_Pearl(player))
-        set_rule(world.get_entrance('Lake Hylia Central Island Pier', player), lambda state: state.has_Pearl(player))
-        set_rule(world.get_entrance('Lake Hylia Island Pier', player), lambda state: state.has_Pearl(player))
-        set_rule(world.get_entrance('Lake Hylia Warp', player), lambda state: state.has_Pearl(player))
-        set_rule(world.get_entrance('Northeast Light World Warp', player), lambda state: state.has_Pearl(player))
-        set_rule(world.get_entrance('Hobo Bridge', player), lambda state: state.has_Pearl(player))
+        set_rule(world.get_entrance('Zoras River', player), create_helper_rule('has_Pearl', player))
+        set_rule(world.get_entrance('Lake Hylia Central Island Pier', player), create_helper_rule('has_Pearl', player))
+        set_rule(world.get_entrance('Lake Hylia Island Pier', player), create_helper_rule('has_Pearl', player))
+        set_rule(world.get_entrance('Lake Hylia Warp', player), create_helper_rule('has_Pearl', player))
+        set_rule(world.get_entrance('Northeast Light World Warp', player), create_helper_rule('has_Pearl', player))
+        set_rule(world.get_entrance('Hobo Bridge', player), create_helper_rule('has_Pearl', player))
         set_rule(world.get_entrance('Dark Lake Hylia Drop (East)', player), lambda state: state.has('Flippers', player))
         set_rule(world.get_entrance('Dark Lake Hylia Teleporter', player), lambda state: True)
         set_rule(world.get_entrance('Dark Lake Hylia Ledge Drop', player), lambda state: True)
@@ -1617,7 +1622,7 @@ def set_inverted_big_bomb_rules(world, player):
         pass
     elif bombshop_entrance.name in Normal_LW_entrances:
         # Just walk to the castle and mirror.
-        add_rule(world.get_entrance('Pyramid Fairy', player), lambda state: state.has_Mirror(player))
+        add_rule(world.get_entrance('Pyramid Fairy', player), create_helper_rule('has_Mirror', player))
     elif bombshop_entrance.name in Isolated_LW_entrances:
         # For these entrances, you cannot walk to the castle/pyramid and thus must use Mirror and then Flute.
         add_rule(world.get_entrance('Pyramid Fairy', player), lambda state: state.can_flute(player) and state.has_Mirror(player))
@@ -2013,11 +2018,15 @@ def retro_in_hc(spot):
 
 
 def create_rule(item_name, player):
-    return lambda state: state.has(item_name, player)
+    return HasItem(item_name, player)
+
+
+def create_helper_rule(helper_name, player):
+    return HasHelper(helper_name, player)
 
 
 def create_key_rule(small_key_name, player, keys):
-    return lambda state: state.has_sm_key(small_key_name, player, keys)
+    return HasSmallKey(small_key_name, player, keys)
 
 
 def create_key_rule_allow_small(small_key_name, player, keys, location):
@@ -140,6 +140,22 @@ def ncr(n, r):
     return numerator / denominator
 
 
+def random_permutation(n, round_keys):
+    # yields every integer in range(n) exactly once without building the list. Each index of the smallest domain with
+    # an even bit width that covers n is mapped through a Feistel network keyed by round_keys, and results past n are
+    # skipped, so at most four indices are tried per value
+    n = int(n)
+    half_bits = max(1, ((n - 1).bit_length() + 1) // 2)
+    mask = (1 << half_bits) - 1
+    for idx in range(1 << (half_bits * 2)):
+        left, right = idx >> half_bits, idx & mask
+        for key in round_keys:
+            left, right = right, left ^ ((((right ^ key) * 0x9E3779B1) >> 7) & mask)
+        value = (left << half_bits) | right
+        if value < n:
+            yield value
+
+
 entrance_offsets = {
     'Sanctuary': 0x2,
     'HC West': 0x3,
@@ -1,6 +1,6 @@
 import unittest
 
-from BaseClasses import World, CollectionState
+from BaseClasses import World, CollectionState, CrystalBarrier
 from Dungeons import create_dungeons, get_dungeon_item_pool
 from EntranceShuffle import mandatory_connections, connect_simple
 from ItemList import difficulties, generate_itempool
@@ -27,10 +27,14 @@ class TestDungeon(unittest.TestCase):
         self.world.itempool.extend(get_dungeon_item_pool(self.world))
         self.world.itempool.extend(ItemFactory(['Green Pendant', 'Red Pendant', 'Blue Pendant', 'Beat Agahnim 1', 'Beat Agahnim 2', 'Crystal 1', 'Crystal 2', 'Crystal 3', 'Crystal 4', 'Crystal 5', 'Crystal 6', 'Crystal 7'], 1))
 
-    def run_tests(self, access_pool):
-        for region in self.starting_regions:
-            self.world.get_region(region, 1).can_reach_private = lambda _: True
+    @staticmethod
+    def start_in(state, region):
+        # reachable from the outset, with its exits queued for the next sweep
+        state.reachable_regions[region.player][region] = CrystalBarrier.Orange
+        for exit in region.exits:
+            state.blocked_connections[region.player][exit] = CrystalBarrier.Orange
 
+    def run_tests(self, access_pool):
         for location, access, *item_pool in access_pool:
             items = item_pool[0]
             all_except = item_pool[1] if len(item_pool) > 1 else None
@@ -42,6 +46,8 @@ class TestDungeon(unittest.TestCase):
                 else:
                     items = ItemFactory(items, 1)
                 state = CollectionState(self.world)
+                for region in self.starting_regions:
+                    self.start_in(state, self.world.get_region(region, 1))
                 for item in items:
                     item.advancement = True
                     state.collect(item)
@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+
+import MultiClient
+from MockSnes import MockSnes, attach_mock_snes, SD2SNES_WRITE_PREFIX
+
+
+class TestSnes(unittest.TestCase):
+    def run_client(self, sd2snes, actions):
+        async def run():
+            ctx = MultiClient.Context(None, None, None)
+            snes = MockSnes(sd2snes, chunk_size=0x100)
+            recv_task = attach_mock_snes(ctx, snes)
+            result = await actions(ctx, snes)
+            await snes.close()
+            await recv_task
+            return result
+        return asyncio.run(run())
+
+    def test_read(self):
+        async def actions(ctx, snes):
+            snes.wram[0xF000:0xF500] = bytes(range(256)) * 5
+            return await MultiClient.snes_read(ctx, MultiClient.SAVEDATA_START, MultiClient.SAVEDATA_SIZE)
+        self.assertEqual(self.run_client(False, actions), bytes(range(256)) * 5)
+
+    def test_buffered_writes_coalesce(self):
+        async def actions(ctx, snes):
+            MultiClient.snes_buffered_write(ctx, MultiClient.RECV_PROGRESS_ADDR, bytes([0x12, 0x34]))
+            MultiClient.snes_buffered_write(ctx, MultiClient.RECV_ITEM_ADDR, bytes([0x0B]))
+            MultiClient.snes_buffered_write(ctx, MultiClient.RECV_ITEM_PLAYER_ADDR, bytes([2]))
+            MultiClient.snes_buffered_write(ctx, MultiClient.SCOUTREPLY_LOCATION_ADDR, bytes([5]))
+            self.assertEqual(ctx.snes_write_buffer, [(MultiClient.RECV_PROGRESS_ADDR, bytes([0x12, 0x34, 0x0B, 2])),
+                                                     (MultiClient.SCOUTREPLY_LOCATION_ADDR, bytes([5]))])
+            await MultiClient.snes_flush_writes(ctx)
+            self.assertEqual(ctx.snes_write_buffer, [])
+            return snes.requests.get('PutAddress', 0), snes.read(MultiClient.RECV_PROGRESS_ADDR, 9)
+
+        self.assertEqual(self.run_client(False, actions), (2, bytes([0x12, 0x34, 0x0B, 2, 0, 0, 0, 0, 5])))
+        self.assertEqual(self.run_client(True, actions), (1, bytes([0x12, 0x34, 0x0B, 2, 0, 0, 0, 0, 5])))
+
+    def test_sd2snes_write_code(self):
+        write_list = [(MultiClient.WRAM_START + 0x100, bytes([1])), (MultiClient.WRAM_START + 0x200, bytes([1, 1, 1, 2, 2])),
+                      (MultiClient.WRAM_START + 0x300, bytes(range(16))), (MultiClient.WRAM_START + 0x400, bytes(64)),
+                      (MultiClient.WRAM_START + 0x500, bytes([7, 8]))]
+
+        async def actions(ctx, snes):
+            snes.wram[:] = b'\xFF' * len(snes.wram)
+            await MultiClient.snes_write(ctx, write_list)
+            return snes.wram
+
+        self.assertEqual(self.run_client(True, actions), self.run_client(False, actions))
+        self.assertEqual(MultiClient.sd2snes_write_code(write_list)[-2:], b'\xE2\x20')
+
+    def test_sd2snes_mixed_width_writes(self):
+        # an 8 bit store right after a 16 bit one reuses the low byte of the loaded value and must not touch the next byte
+        write_list = [(MultiClient.WRAM_START + 0x10, bytes([1, 2])), (MultiClient.WRAM_START + 0x20, bytes([1])),
+                      (MultiClient.WRAM_START + 0x30, bytes([3])), (MultiClient.WRAM_START + 0x40, bytes([3, 2, 5]))]
+        snes = MockSnes(True)
+        snes.wram[:0x50] = b'\xFF' * 0x50
+        snes.run_sd2snes_cmd(SD2SNES_WRITE_PREFIX + MultiClient.sd2snes_write_code(write_list))
+        expected = bytearray(b'\xFF' * 0x50)
+        for address, data in write_list:
+            expected[address - MultiClient.WRAM_START:address - MultiClient.WRAM_START + len(data)] = data
+        self.assertEqual(snes.wram[:0x50], expected)
+
+    def test_mock_accumulator_width(self):
+        # LDA with an 8 bit accumulator keeps the high byte, STA stores as many bytes as the M flag says
+        snes = MockSnes(True)
+        snes.run_sd2snes_cmd(SD2SNES_WRITE_PREFIX + b'\xC2\x20\xA9\x01\x02\xE2\x20\x8F\x00\x01\x7E\xA9\x03'
+                             b'\x8F\x10\x01\x7E\xC2\x20\x8F\x20\x01\x7E\xE2\x20')
+        self.assertEqual(snes.wram[0x100:0x102], bytes([1, 0]))
+        self.assertEqual(snes.wram[0x110:0x112], bytes([3, 0]))
+        self.assertEqual(snes.wram[0x120:0x122], bytes([3, 2]))
+
+    def test_track_locations(self):
+        async def actions(ctx, snes):
+            snes.write(MultiClient.SAVEDATA_START + 0x3c9, bytes([0x10]))
+            await MultiClient.track_locations(ctx, 0, 0)
+            return ctx.locations_checked
+        self.assertEqual(self.run_client(False, actions), {'Purple Chest'})
@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import MultiServer
+from MultiServer import ReceivedItem
+
+
+class TestSaveJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.ctx = self.create_context()
+        MultiServer.save_snapshot(self.ctx)
+        self.addCleanup(self.close_journal, self.ctx)
+
+    def create_context(self):
+        ctx = MultiServer.Context('localhost', 0, None)
+        ctx.save_filename = os.path.join(self.directory, 'Test_multisave')
+        ctx.rom_names = {(1, 2, 3): (0, 1), (4, 5, 6): (0, 2)}
+        return ctx
+
+    @staticmethod
+    def close_journal(ctx):
+        if ctx.save_journal:
+            ctx.save_journal.close()
+            ctx.save_journal = None
+
+    def receive(self, items):
+        for player, item, location, sender in items:
+            MultiServer.add_received_item(self.ctx, 0, player, ReceivedItem(item, location, sender))
+        MultiServer.sync_save(self.ctx)
+
+    def restore(self):
+        ctx = self.create_context()
+        MultiServer.load_save(ctx)
+        return {key: MultiServer.tuplize_received_items(items) for key, items in ctx.received_items.items()}
+
+    def expected(self):
+        return {key: MultiServer.tuplize_received_items(items) for key, items in self.ctx.received_items.items()}
+
+    def test_journal_after_snapshot(self):
+        self.receive([(1, 0x0B, 100, 2), (2, 0x0C, 200, 1)])
+        MultiServer.save_snapshot(self.ctx)
+        self.receive([(1, 0x0D, 101, 2), (1, 0x0E, 102, 2)])
+        self.assertEqual(self.restore(), self.expected())
+        self.assertEqual(len(self.restore()[(0, 1)]), 3)
+
+    def test_torn_final_record(self):
+        self.receive([(1, 0x0B, 100, 2), (2, 0x0C, 200, 1)])
+        expected = self.expected()
+        with open(MultiServer.get_journal_filename(self.ctx), 'a') as journal:
+            journal.write('[0, 1, 1, {"item": 13, "loca')
+        self.assertEqual(self.restore(), expected)
+
+    def test_replay_is_idempotent(self):
+        self.receive([(1, 0x0B, 100, 2), (2, 0x0C, 200, 1), (1, 0x0D, 101, 2)])
+        with open(MultiServer.get_journal_filename(self.ctx), 'r') as journal:
+            stale_journal = journal.read()
+        MultiServer.save_snapshot(self.ctx)
+        self.receive([(2, 0x0E, 201, 1)])
+        expected = self.expected()
+
+        # a crash between writing the snapshot and truncating the journal leaves entries the snapshot already holds
+        with open(MultiServer.get_journal_filename(self.ctx), 'r') as journal:
+            journal_text = stale_journal + journal.read()
+        self.close_journal(self.ctx)
+        with open(MultiServer.get_journal_filename(self.ctx), 'w') as journal:
+            journal.write(journal_text)
+        self.assertEqual(self.restore(), expected)
+
+        ctx = self.create_context()
+        MultiServer.load_save(ctx)
+        MultiServer.replay_save_journal(ctx)
+        self.assertEqual({key: MultiServer.tuplize_received_items(items) for key, items in ctx.received_items.items()}, expected)
+
+    def test_corrupt_snapshot(self):
+        self.receive([(1, 0x0B, 100, 2)])
+        with open(self.ctx.save_filename, 'wb') as snapshot:
+            snapshot.write(b'not a save')
+        with self.assertRaises(Exception):
+            self.restore()
+
+    def test_set_aside_save(self):
+        self.receive([(1, 0x0B, 100, 2)])
+        with open(self.ctx.save_filename, 'wb') as snapshot:
+            snapshot.write(b'not a save')
+        self.close_journal(self.ctx)
+        with open(MultiServer.get_journal_filename(self.ctx), 'r') as journal:
+            journal_text = journal.read()
+
+        ctx = self.create_context()
+        self.addCleanup(self.close_journal, ctx)
+        moved = MultiServer.set_aside_save(ctx)
+        suffix = moved[0][len(ctx.save_filename):]
+        self.assertTrue(suffix.startswith('_bad_'))
+        self.assertEqual(moved, [ctx.save_filename + suffix, MultiServer.get_journal_filename(ctx) + suffix])
+        self.assertFalse(os.path.exists(ctx.save_filename))
+        self.assertFalse(os.path.exists(MultiServer.get_journal_filename(ctx)))
+        with open(moved[1], 'r') as journal:
+            self.assertEqual(journal.read(), journal_text)
+
+        # a fresh game saves normally, and a second failure does not overwrite the first
+        MultiServer.save_snapshot(ctx)
+        MultiServer.add_received_item(ctx, 0, 2, ReceivedItem(0x0C, 200, 1))
+        MultiServer.sync_save(ctx)
+        self.assertEqual(self.restore(), {(0, 2): MultiServer.tuplize_received_items(ctx.received_items[0, 2])})
+        self.close_journal(ctx)
+        moved_again = MultiServer.set_aside_save(ctx)
+        self.assertEqual(len(set(moved + moved_again)), 4)
+        self.assertTrue(all(os.path.exists(filename) for filename in moved + moved_again))
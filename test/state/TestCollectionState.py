@@ -0,0 +1,144 @@
+import itertools
+import unittest
+from unittest import mock
+
+from BaseClasses import World, CollectionState, HasHelper, ItemProbe, function_reads_only_items, helper_items
+from DoorShuffle import link_doors
+from Doors import create_doors
+from Dungeons import create_dungeons, get_dungeon_item_pool
+from EntranceShuffle import link_entrances
+from InvertedRegions import mark_dark_world_regions
+from ItemList import difficulties, generate_itempool
+from Items import ItemFactory
+from Regions import create_regions, create_dungeon_regions, create_shops
+from RoomData import create_rooms
+from Rules import set_rules
+
+
+def create_vanilla_world():
+    world = World(1, {1:'vanilla'}, {1:'vanilla'}, {1:'noglitches'}, {1:'open'}, {1:'random'}, {1:'normal'}, {1:'normal'}, 'none', 'on', {1:'ganon'}, 'balanced', {1:'items'},
+                  {1:True}, {1:False}, False, None, {1:False})
+    world.difficulty_requirements[1] = difficulties['normal']
+    world.intensity = {1:1}
+    create_regions(world, 1)
+    create_dungeon_regions(world, 1)
+    create_shops(world, 1)
+    create_doors(world, 1)
+    create_rooms(world, 1)
+    create_dungeons(world, 1)
+    link_entrances(world, 1)
+    link_doors(world, 1)
+    generate_itempool(world, 1)
+    world.required_medallions[1] = ['Ether', 'Quake']
+    world.itempool.extend(get_dungeon_item_pool(world))
+    world.get_location('Agahnim 1', 1).item = None
+    world.get_location('Agahnim 2', 1).item = None
+    mark_dark_world_regions(world, 1)
+    set_rules(world, 1)
+    return world
+
+
+class TestCollectionState(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.world = create_vanilla_world()
+
+    def collect(self, state, items):
+        for item in ItemFactory(items, 1):
+            state.collect(item, True)
+
+    @staticmethod
+    def snapshot(state, player=1):
+        return (dict(state.reachable_regions[player].items()), dict(state.blocked_connections[player]), dict(state.prog_items),
+                set(state.opened_doors[player]), set(state.reached_doors[player]), dict(state.door_counter[player][0]),
+                dict(state.door_counter[player][1]), set(state.locations_checked), list(state.events))
+
+    def test_copy_is_independent(self):
+        state = CollectionState(self.world)
+        self.collect(state, ['Progressive Glove', 'Lamp'])
+        state.sweep_for_events()
+        before = self.snapshot(state)
+
+        copy = state.copy()
+        self.collect(copy, ['Hammer', 'Moon Pearl', 'Flippers', 'Progressive Glove'])
+        copy.sweep_for_events()
+        self.assertEqual(self.snapshot(state), before)
+        self.assertNotEqual(self.snapshot(copy), before)
+
+        copied = self.snapshot(copy)
+        self.collect(state, ['Hookshot', 'Pegasus Boots'])
+        state.sweep_for_events()
+        self.assertEqual(self.snapshot(copy), copied)
+
+    def test_key_door_child_states(self):
+        # the same exploration with every copy unshared straight away is the reference
+        items = ['Lamp', 'Progressive Glove', 'Progressive Glove', 'Hammer', 'Moon Pearl', 'Flippers', 'Bow', 'Fire Rod', 'Small Key (Escape)']
+        shared_copy = CollectionState.copy
+
+        def unshared_copy(state):
+            ret = shared_copy(state)
+            for player in ret.share_counts:
+                ret.unshare(player)
+            return ret
+
+        self.world.clear_exp_cache()
+        reference = CollectionState(self.world)
+        self.collect(reference, items)
+        with mock.patch.object(CollectionState, 'copy', unshared_copy):
+            reference.sweep_for_events()
+
+        self.world.clear_exp_cache()
+        state = CollectionState(self.world)
+        state.update_reachable_regions(1)
+        before = self.snapshot(state)
+        copy = state.copy()
+        self.collect(copy, items)
+        with mock.patch.object(CollectionState, 'copy', autospec=True, side_effect=shared_copy) as child_copies:
+            copy.sweep_for_events()
+        self.assertGreater(child_copies.call_count, 0)
+        self.assertEqual(self.snapshot(state), before)
+        self.assertEqual(self.snapshot(copy), self.snapshot(reference))
+
+    def test_rule_with_defaults_is_not_cached(self):
+        # a rule hidden in a default argument reads regions, so failing it once must not park the connection on items
+        entrance = self.world.get_entrance('Blinds Hideout', 1)
+        self.addCleanup(setattr, entrance, 'access_rule', entrance.access_rule)
+        entrance.access_rule = lambda state, reach=lambda state: state.can_reach('Sahasrahlas Hut', 'Region', 1): reach(state)
+        self.assertFalse(function_reads_only_items(entrance.access_rule))
+
+        state = CollectionState(self.world)
+        state.sweep_for_events()
+        state.stale[1] = True
+        state.update_reachable_regions(1)
+        self.assertNotIn(entrance, state.blocked_items[1])
+        self.assertIn(entrance.connected_region, state.reachable_regions[1])
+
+    def test_regions_of_other_worlds_do_not_alias(self):
+        other = create_vanilla_world()
+        state = CollectionState(self.world)
+        state.update_reachable_regions(1)
+        region = self.world.get_region('Links House', 1)
+        other_region = other.get_region('Links House', 1)
+        self.assertEqual(region.index, other_region.index)
+        self.assertIn(region, state.reachable_regions[1])
+        self.assertNotIn(other_region, state.reachable_regions[1])
+        self.assertIsNone(state.reachable_regions[1].get(other_region))
+        with self.assertRaises(ValueError):
+            state.reachable_regions[1][other_region] = 1
+
+    def test_helper_dependencies(self):
+        # every key a helper looks up has to be in its dependencies, or blocked connections would never be retried
+        for helper, items in helper_items.items():
+            rule = HasHelper(helper, 1)
+            for count in range(len(items) + 1):
+                for held in itertools.combinations(items, count):
+                    state = CollectionState(self.world)
+                    state.prog_items.update((item, 1) for item in held)
+                    expected = getattr(state, helper)(1)
+                    probe = state.prog_items = ItemProbe(state.prog_items)
+                    with self.subTest(helper=helper, items=held):
+                        self.assertEqual(rule(state), expected)
+                        self.assertTrue(probe.complete)
+                        self.assertLessEqual(set(probe.seen), rule.dependencies())
+        with self.assertRaises(ValueError):
+            HasHelper('can_flute', 1)
@@ -0,0 +1,109 @@
+import itertools
+import unittest
+
+from collections import Counter
+
+from BaseClasses import HasItem, HasSmallKey, AllOf, AnyOf, ItemProbe, all_of, any_of, rules_dependencies, function_reads_only_items
+from Rules import add_rule, or_rule, forbid_item, add_item_rule, create_rule
+
+
+class ItemState(object):
+    """Just enough of a CollectionState for item rules, logging each lookup"""
+    def __init__(self, items):
+        self.items = items
+        self.lookups = []
+
+    def has(self, item, player, count=1):
+        self.lookups.append(item)
+        return self.items.count((item, player)) >= count
+
+    def has_sm_key(self, item, player, count=1):
+        return self.has(item, player, count)
+
+
+class Spot(object):
+    def __init__(self):
+        self.access_rule = lambda state: True
+        self.item_rule = lambda item: True
+
+
+class Item(object):
+    def __init__(self, name, player):
+        self.name = name
+        self.player = player
+
+
+class TestRules(unittest.TestCase):
+    names = ['Hammer', 'Hookshot', 'Lamp', 'Flippers']
+
+    def states(self):
+        for count in range(len(self.names) + 1):
+            for items in itertools.combinations(self.names, count):
+                yield [(item, 1) for item in items]
+
+    def test_combined_rules_match_lambda_composition(self):
+        spot = Spot()
+        expected = spot.access_rule
+        for rule, combine in [(create_rule('Hammer', 1), 'and'), (create_rule('Hookshot', 1), 'or'),
+                              (lambda state: state.has('Lamp', 1), 'and'), (or_rule(create_rule('Flippers', 1), create_rule('Lamp', 1)), 'and')]:
+            add_rule(spot, rule, combine)
+            old_rule = expected
+            if combine == 'or':
+                expected = lambda state, rule=rule, old_rule=old_rule: rule(state) or old_rule(state)
+            else:
+                expected = lambda state, rule=rule, old_rule=old_rule: rule(state) and old_rule(state)
+
+            for items in self.states():
+                combined, composed = ItemState(items), ItemState(items)
+                with self.subTest(items=items):
+                    self.assertEqual(spot.access_rule(combined), expected(composed))
+                    self.assertEqual(combined.lookups, composed.lookups)
+
+    def test_flattening(self):
+        hammer, hookshot, lamp = HasItem('Hammer', 1), HasItem('Hookshot', 1), HasItem('Lamp', 1)
+        self.assertEqual(all_of(all_of(hammer, hookshot), lamp).rules, (hammer, hookshot, lamp))
+        self.assertEqual(any_of(hammer, any_of(hookshot, lamp)).rules, (hammer, hookshot, lamp))
+        nested = any_of(all_of(hammer, hookshot), lamp)
+        self.assertIs(type(nested.rules[0]), AllOf)
+        self.assertEqual(len(all_of(nested, hammer).rules), 2)
+
+    def test_rules_dependencies(self):
+        rule = all_of(HasItem('Hammer', 1), any_of(HasItem('Hookshot', 2), HasItem('Hammer', 1, 2)))
+        self.assertEqual(rule.dependencies(), frozenset([('Hammer', 1), ('Hookshot', 2)]))
+        self.assertIsNone(rules_dependencies([rule, lambda state: True]))
+        self.assertIsNone(AnyOf([HasItem('Hammer', 1), HasSmallKey('Small Key (Escape)', 1)]).dependencies())
+
+    def test_item_rules(self):
+        location, expected = Spot(), lambda item: True
+        for step in range(3):
+            forbid_item(location, 'Hammer', step)
+            add_item_rule(location, lambda item, step=step: item.name != self.names[step + 1])
+            old_rule = expected
+            expected = lambda item, step=step, old_rule=old_rule: (item.name != self.names[step + 1]
+                                                                   and (item.name != 'Hammer' or item.player != step) and old_rule(item))
+        for name, player in itertools.product(self.names, range(4)):
+            with self.subTest(name=name, player=player):
+                self.assertEqual(location.item_rule(Item(name, player)), expected(Item(name, player)))
+
+    def test_reads_only_items(self):
+        other_rule = lambda state: state.can_reach('Light World', 'Region', 1)
+        self.assertTrue(function_reads_only_items(lambda state: state.has('Hammer', 1) and state.has_Boots(1)))
+        self.assertFalse(function_reads_only_items(other_rule))
+        self.assertFalse(function_reads_only_items(lambda state: other_rule(state)))
+        self.assertFalse(function_reads_only_items(lambda state, rule=other_rule: rule(state)))
+        self.assertFalse(function_reads_only_items(lambda state, *, rule=other_rule: rule(state)))
+
+    def test_item_probe(self):
+        items = Counter({('Hammer', 1): 1})
+        probe = ItemProbe(items)
+        self.assertIn(('Hammer', 1), probe)
+        self.assertEqual(probe[('Lamp', 1)], 0)
+        self.assertEqual(probe.seen, {('Hammer', 1): 1, ('Lamp', 1): 0})
+        self.assertTrue(probe.complete)
+
+        copied = probe.copy()
+        self.assertEqual(copied, items)
+        self.assertFalse(probe.complete)
+        probe[('Lamp', 1)] += 1
+        self.assertEqual(items[('Lamp', 1)], 1)
+        self.assertEqual(sorted(probe.items()), [(('Hammer', 1), 1), (('Lamp', 1), 1)])
@@ -0,0 +1,34 @@
+import random
+import unittest
+
+from Utils import ncr, random_permutation
+
+
+class TestRandomPermutation(unittest.TestCase):
+    # powers of two and their neighbours, odd bit widths where most of the domain is skipped, and small edge cases
+    sizes = [0, 1, 2, 3, 4, 5, 7, 8, 9, 15, 16, 17, 31, 33, 100, 255, 256, 257, 1000, 4095, 4097, 65537]
+
+    def round_key_sets(self):
+        rng = random.Random(1)
+        yield []
+        yield [0, 0, 0, 0]
+        yield [0xFFFFFFFF]
+        for rounds in [1, 3, 4, 7]:
+            yield [rng.getrandbits(32) for _ in range(rounds)]
+
+    def test_every_index_exactly_once(self):
+        for round_keys in self.round_key_sets():
+            for n in self.sizes:
+                with self.subTest(n=n, round_keys=round_keys):
+                    self.assertEqual(sorted(random_permutation(n, round_keys)), list(range(n)))
+
+    def test_combination_counts(self):
+        # the key door search passes the float that ncr returns
+        n = ncr(12, 5)
+        self.assertEqual(sorted(random_permutation(n, [1, 2, 3, 4])), list(range(792)))
+
+    def test_order_depends_on_keys(self):
+        first = list(random_permutation(1000, [1, 2, 3, 4]))
+        self.assertNotEqual(first, list(range(1000)))
+        self.assertNotEqual(first, list(random_permutation(1000, [5, 6, 7, 8])))
+        self.assertEqual(first, list(random_permutation(1000, [1, 2, 3, 4])))